@@ -5,13 +5,27 @@
 
 import asyncio
 import logging
-from typing import Dict, Any, List, Callable, Optional
+from typing import Dict, Any, List, Callable, Optional, Set, Tuple
 import redis.asyncio as redis
 from dataclasses import dataclass
 import json
-import uuid
+import itertools
+import secrets
+import threading
 
-@dataclass
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import msgspec
+    HAS_MSGSPEC = True
+except ImportError:
+    HAS_MSGSPEC = False
+
+@dataclass(slots=True)
 class Message:
     """Структура сообщения в шине"""
     message_id: str
@@ -29,42 +43,101 @@ class CommunicationBus:
         self.config = config
         self.logger = logging.getLogger('core.communication_bus')
         
-        # Подписчики на типы сообщений
-        self.subscribers: Dict[str, List[Callable]] = {}
+        # Подписчики на типы сообщений: пары (обработчик, является ли корутиной).
+        # Кортежи неизменяемы: subscribe/unsubscribe заменяют их целиком,
+        # поэтому доставка работает со снимком подписчиков
+        self.subscribers: Dict[str, Tuple[Tuple[Callable, bool], ...]] = {}
         
         # Redis клиент для продакшена
         self.redis_client: Optional[redis.Redis] = None
+        self._redis_pool: Optional[redis.ConnectionPool] = None
         self.use_redis = config.get('use_redis', False)
         
-        # In-memory хранилище для разработки
-        self.message_queue: asyncio.Queue = asyncio.Queue()
+        # In-memory режим: по умолчанию подписчики вызываются напрямую из
+        # send_message, очередь используется только в буферизованном режиме
+        self.buffered = config.get('buffered', False)
+        self.message_queue: Optional[asyncio.Queue] = asyncio.Queue() if self.buffered else None
         self.is_running = False
         self.processing_task: Optional[asyncio.Task] = None
+        
+        # Цикл событий, в котором работает шина (запоминается в initialize)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        
+        # Пакетная публикация в Redis: сообщения одного тика цикла событий
+        # накапливаются в буфере и отправляются одним pipeline
+        self.batch_max = config.get('batch_max', 128)
+        self.batch_interval = config.get('batch_interval', 0.001)
+        self._send_buf: List[Message] = []
+        self._flush_event = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+        
+        # Формат сообщений в Redis: 'json' или 'msgpack' (требует msgspec).
+        # Оба кодировщика сериализуют dataclass Message напрямую, без промежуточного dict
+        self.wire_format = config.get('wire_format', 'json')
+        self._msg_encoder = None
+        if self.wire_format == 'msgpack':
+            if HAS_MSGSPEC:
+                self._msg_encoder = msgspec.msgpack.Encoder()
+            else:
+                self.logger.warning("msgspec не установлен, сообщения в Redis сериализуются в JSON")
+        
+        # Генератор ID сообщений: случайный префикс экземпляра + счетчик
+        self._id_prefix = secrets.token_hex(4)
+        self._id_counter = itertools.count()
+        
+        # Ожидающие ответа вызовы send_to_module: message_id -> Future
+        self._pending: Dict[str, asyncio.Future] = {}
+        
+        # Задачи асинхронных обработчиков, запущенные при прямой доставке
+        self._callback_tasks: Set[asyncio.Task] = set()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Цикл событий шины; если initialize() не вызывался, запоминается текущий"""
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._loop_thread_id = threading.get_ident()
+        return self._loop
 
     async def initialize(self):
         """Инициализация шины сообщений"""
         try:
+            self._loop = asyncio.get_running_loop()
+            self._loop_thread_id = threading.get_ident()
+            
             if self.use_redis:
-                self.redis_client = redis.Redis(
-                    host=self.config.get('redis_host', 'localhost'),
-                    port=self.config.get('redis_port', 6379),
-                    password=self.config.get('redis_password'),
-                    decode_responses=True
-                )
+                # Ограниченный пул соединений вместо одного соединения на клиента
+                pool_size = self.config.get('pool_size', 32)
+                if self.config.get('redis_url'):
+                    self._redis_pool = redis.ConnectionPool.from_url(
+                        self.config['redis_url'],
+                        max_connections=pool_size
+                    )
+                else:
+                    self._redis_pool = redis.ConnectionPool(
+                        host=self.config.get('redis_host', 'localhost'),
+                        port=self.config.get('redis_port', 6379),
+                        password=self.config.get('redis_password'),
+                        max_connections=pool_size
+                    )
+                self.redis_client = redis.Redis(connection_pool=self._redis_pool)
                 # Проверяем подключение
                 await self.redis_client.ping()
                 self.logger.info("Redis подключен для шины сообщений")
             else:
                 self.logger.info("Используется in-memory шина сообщений")
             
-            # Запускаем обработчик сообщений
+            # Запускаем обработчик очереди (только в буферизованном режиме)
             self.is_running = True
-            self.processing_task = asyncio.create_task(self._message_processor())
+            if self.buffered:
+                self.processing_task = asyncio.create_task(self._message_processor())
+            if self.redis_client:
+                self._flush_task = asyncio.create_task(self._redis_flusher())
             
             self.logger.info("Шина сообщений инициализирована")
             
         except Exception as e:
-            self.logger.error(f"Ошибка инициализации шины сообщений: {e}")
+            self.logger.error("Ошибка инициализации шины сообщений: %s", e)
             raise
 
     async def is_healthy(self) -> bool:
@@ -78,10 +151,12 @@ class CommunicationBus:
             if self.use_redis and self.redis_client:
                 # Проверяем подключение к Redis
                 await self.redis_client.ping()
-            # Для in-memory проверяем что обработчик запущен
-            return self.is_running and (self.processing_task is not None and not self.processing_task.done())
+            # В буферизованном режиме проверяем что обработчик очереди запущен
+            if self.buffered:
+                return self.is_running and (self.processing_task is not None and not self.processing_task.done())
+            return self.is_running
         except Exception as e:
-            self.logger.warning(f"Проверка здоровья шины сообщений не пройдена: {e}")
+            self.logger.warning("Проверка здоровья шины сообщений не пройдена: %s", e)
             return False
 
     async def send_message(self, message: Message) -> str:
@@ -96,26 +171,22 @@ class CommunicationBus:
         """
         try:
             if self.use_redis and self.redis_client:
-                # Отправка через Redis
-                channel = f"module:{message.destination}"
-                message_data = {
-                    'message_id': message.message_id,
-                    'source': message.source,
-                    'destination': message.destination,
-                    'message_type': message.message_type,
-                    'data': message.data,
-                    'timestamp': message.timestamp
-                }
-                await self.redis_client.publish(channel, json.dumps(message_data))
-            else:
-                # In-memory отправка
+                # Отправка через Redis: публикация выполняется пакетом в _redis_flusher
+                self._send_buf.append(message)
+                self._flush_event.set()
+            elif self.buffered:
+                # Буферизованная in-memory отправка
                 await self.message_queue.put(message)
+            else:
+                # Прямая доставка подписчикам
+                self._dispatch(message)
             
-            self.logger.debug(f"Сообщение {message.message_id} отправлено от {message.source} к {message.destination}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Сообщение %s отправлено от %s к %s", message.message_id, message.source, message.destination)
             return message.message_id
             
         except Exception as e:
-            self.logger.error(f"Ошибка отправки сообщения: {e}")
+            self.logger.error("Ошибка отправки сообщения: %s", e)
             raise
 
     async def send_to_module(self, module_name: str, message_type: str, data: Dict[str, Any]) -> Any:
@@ -130,35 +201,36 @@ class CommunicationBus:
         Returns:
             Ответ от модуля
         """
+        loop = self._get_loop()
         message = Message(
-            message_id=str(uuid.uuid4()),
+            message_id=self._next_message_id(),
             source='coordinator',
             destination=module_name,
             message_type=message_type,
             data=data,
-            timestamp=asyncio.get_event_loop().time()
+            timestamp=loop.time()
         )
         
-        # Создаем Future для ожидания ответа
-        response_future = asyncio.Future()
-        
-        # Временная подписка на ответ
-        response_type = f"response_{message.message_id}"
-        self.subscribe(response_type, lambda msg: response_future.set_result(msg.data))
-        
-        # Отправляем сообщение
-        await self.send_message(message)
+        # Future ответа регистрируется в таблице ожидания по ID сообщения
+        response_future = loop.create_future()
+        self._pending[message.message_id] = response_future
         
         try:
+            # Отправляем сообщение
+            await self.send_message(message)
+            
             # Ждем ответ с таймаутом
             response = await asyncio.wait_for(response_future, timeout=30.0)
             return response
         except asyncio.TimeoutError:
-            self.logger.error(f"Таймаут ожидания ответа от {module_name}")
+            self.logger.error("Таймаут ожидания ответа от %s", module_name)
             return {'error': 'timeout'}
         finally:
-            # Убираем временную подписку
-            self.unsubscribe(response_type)
+            self._pending.pop(message.message_id, None)
+
+    def _next_message_id(self) -> str:
+        """Генерация ID сообщения, уникального в пределах процесса"""
+        return f"{self._id_prefix}-{next(self._id_counter):x}"
 
     def subscribe(self, message_type: str, callback: Callable):
         """
@@ -168,10 +240,11 @@ class CommunicationBus:
             message_type: Тип сообщения для подписки
             callback: Функция-обработчик
         """
-        if message_type not in self.subscribers:
-            self.subscribers[message_type] = []
-        self.subscribers[message_type].append(callback)
-        self.logger.debug(f"Добавлена подписка на {message_type}")
+        # Тип обработчика определяется один раз, а не при каждой доставке
+        is_coroutine = (asyncio.iscoroutinefunction(callback) or
+                        asyncio.iscoroutinefunction(getattr(callback, '__call__', None)))
+        self.subscribers[message_type] = self.subscribers.get(message_type, ()) + ((callback, is_coroutine),)
+        self.logger.debug("Добавлена подписка на %s", message_type)
 
     def unsubscribe(self, message_type: str, callback: Callable = None):
         """
@@ -182,33 +255,151 @@ class CommunicationBus:
             callback: Конкретный обработчик (если None - отписываем все)
         """
         if message_type in self.subscribers:
+            remaining = ()
             if callback:
-                self.subscribers[message_type] = [cb for cb in self.subscribers[message_type] if cb != callback]
+                remaining = tuple(entry for entry in self.subscribers[message_type] if entry[0] != callback)
+            if remaining:
+                self.subscribers[message_type] = remaining
             else:
-                self.subscribers[message_type] = []
-            self.logger.debug(f"Удалена подписка с {message_type}")
+                del self.subscribers[message_type]
+            self.logger.debug("Удалена подписка с %s", message_type)
+
+    def _serialize_message(self, message: Message) -> bytes:
+        """Сериализация сообщения для публикации в Redis"""
+        if self._msg_encoder is not None:
+            return self._msg_encoder.encode(message)
+        if HAS_ORJSON:
+            return orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps({
+            'message_id': message.message_id,
+            'source': message.source,
+            'destination': message.destination,
+            'message_type': message.message_type,
+            'data': message.data,
+            'timestamp': message.timestamp,
+            'priority': message.priority
+        }).encode('utf-8')
+
+    async def _redis_flusher(self):
+        """Фоновая отправка накопленных сообщений в Redis"""
+        while self.is_running:
+            try:
+                await self._flush_event.wait()
+                self._flush_event.clear()
+                
+                # Даем накопиться сообщениям, отправленным в том же тике
+                if len(self._send_buf) < self.batch_max:
+                    await asyncio.sleep(self.batch_interval)
+                
+                await self._flush_send_buffer()
+                
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error("Ошибка пакетной отправки сообщений: %s", e)
+
+    async def _flush_send_buffer(self):
+        """Публикация буфера сообщений через Redis pipeline"""
+        while self._send_buf:
+            batch = self._send_buf[:self.batch_max]
+            del self._send_buf[:self.batch_max]
+            
+            try:
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    for message in batch:
+                        pipe.publish(f"module:{message.destination}", self._serialize_message(message))
+                    await pipe.execute()
+            except Exception as e:
+                self.logger.error("Ошибка публикации %s сообщений в Redis: %s", len(batch), e)
+
+    def _resolve_pending(self, message: Message) -> bool:
+        """
+        Передача ответа ожидающему вызову send_to_module
+        
+        Ответ адресуется либо типом 'response' с data['in_reply_to'],
+        либо типом 'response_<message_id>'.
+        
+        Returns:
+            True если сообщение было ответом на ожидающий запрос
+        """
+        message_type = message.message_type
+        if message_type == 'response':
+            reply_to = message.data.get('in_reply_to')
+        elif message_type.startswith('response_'):
+            reply_to = message_type[len('response_'):]
+        else:
+            return False
+        
+        response_future = self._pending.get(reply_to)
+        if response_future is None:
+            return False
+        
+        if threading.get_ident() == self._loop_thread_id:
+            self._set_response(response_future, message.data)
+        else:
+            # Ответ пришел не из потока цикла событий (например, из фонового
+            # читателя Redis) - Future можно трогать только из его цикла
+            self._loop.call_soon_threadsafe(self._set_response, response_future, message.data)
+        return True
+
+    @staticmethod
+    def _set_response(response_future: asyncio.Future, data: Any):
+        """Установка результата, если Future еще не завершен (дубль ответа или таймаут)"""
+        if not response_future.done():
+            response_future.set_result(data)
+
+    def _dispatch(self, message: Message):
+        """Прямая доставка сообщения подписчикам без очереди"""
+        if self._resolve_pending(message):
+            return
+        
+        callbacks = self.subscribers.get(message.message_type)
+        if not callbacks:
+            return
+        
+        for callback, is_coroutine in callbacks:
+            try:
+                if is_coroutine:
+                    # Асинхронные обработчики не блокируют отправителя
+                    task = asyncio.create_task(callback(message))
+                    self._callback_tasks.add(task)
+                    task.add_done_callback(self._on_callback_done)
+                else:
+                    callback(message)
+            except Exception as e:
+                self.logger.error("Ошибка в обработчике сообщения: %s", e)
+
+    def _on_callback_done(self, task: asyncio.Task):
+        """Завершение задачи асинхронного обработчика"""
+        self._callback_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.error("Ошибка в обработчике сообщения: %s", task.exception())
 
     async def _message_processor(self):
-        """Обработчик входящих сообщений (для in-memory режима)"""
+        """Обработчик очереди сообщений (для буферизованного in-memory режима)"""
         while self.is_running:
             try:
                 # Ждем сообщение
                 message = await asyncio.wait_for(self.message_queue.get(), timeout=1.0)
                 
-                # Уведомляем подписчиков
-                if message.message_type in self.subscribers:
-                    for callback in self.subscribers[message.message_type]:
+                # Уведомляем подписчиков (снимок на момент получения)
+                callbacks = None if self._resolve_pending(message) else self.subscribers.get(message.message_type)
+                if callbacks:
+                    for callback, is_coroutine in callbacks:
                         try:
-                            await callback(message) if asyncio.iscoroutinefunction(callback) else callback(message)
+                            if is_coroutine:
+                                await callback(message)
+                            else:
+                                callback(message)
                         except Exception as e:
-                            self.logger.error(f"Ошибка в обработчике сообщения: {e}")
+                            self.logger.error("Ошибка в обработчике сообщения: %s", e)
                 
                 self.message_queue.task_done()
                 
             except asyncio.TimeoutError:
                 continue
             except Exception as e:
-                self.logger.error(f"Ошибка обработки сообщения: {e}")
+                self.logger.error("Ошибка обработки сообщения: %s", e)
 
     async def broadcast(self, message_type: str, data: Dict[str, Any]):
         """
@@ -219,12 +410,12 @@ class CommunicationBus:
             data: Данные для рассылки
         """
         message = Message(
-            message_id=str(uuid.uuid4()),
+            message_id=self._next_message_id(),
             source='system',
             destination='broadcast',
             message_type=message_type,
             data=data,
-            timestamp=asyncio.get_event_loop().time()
+            timestamp=self._get_loop().time()
         )
         
         await self.send_message(message)
@@ -234,7 +425,9 @@ class CommunicationBus:
         return {
             'is_running': self.is_running,
             'use_redis': self.use_redis,
-            'queue_size': self.message_queue.qsize() if not self.use_redis else 0,
+            'queue_size': self.message_queue.qsize() if self.message_queue is not None else len(self._send_buf),
+            'pending_callbacks': len(self._callback_tasks),
+            'pending_responses': len(self._pending),
             'subscribers_count': {msg_type: len(callbacks) for msg_type, callbacks in self.subscribers.items()}
         }
 
@@ -249,7 +442,21 @@ class CommunicationBus:
             except asyncio.CancelledError:
                 pass
         
+        for task in list(self._callback_tasks):
+            task.cancel()
+        
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        
         if self.redis_client:
+            # Отправляем то, что осталось в буфере
+            await self._flush_send_buffer()
             await self.redis_client.close()
+        if self._redis_pool:
+            await self._redis_pool.disconnect()
             
         self.logger.info("Шина сообщений завершила работу")
@@ -5,12 +5,46 @@
 
 import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
-import time
-import uuid
+import itertools
+import secrets
 
-@dataclass
+from .module_manager import canonical_module_name
+
+def install_uvloop() -> bool:
+    """
+    Установка политики цикла событий uvloop, если библиотека доступна
+    
+    Должна вызываться до создания цикла событий (до asyncio.run).
+    
+    Returns:
+        True если uvloop будет использоваться
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+# Базовые модули в зависимости от типа ввода
+_BASE_MODULES = {
+    'text': ('text_understander', 'memory_short_term'),
+    'audio': ('speech_recognizer', 'text_understander', 'memory_short_term'),
+    'image': ('visual_processor', 'memory_short_term'),
+}
+
+# Дополнительные модули в зависимости от намерения
+_INTENT_MODULES = {
+    'weather': ('search_agent', 'api_caller'),
+    'calculation': ('logic_analyzer',),
+    'creative': ('creativity',),
+    'planning': ('task_planner', 'goals'),
+    'emotional': ('emotional_engine',),
+}
+
+@dataclass(slots=True)
 class ProcessingContext:
     """Контекст обработки запроса"""
     request_id: str
@@ -23,6 +57,7 @@ class ProcessingContext:
     final_response: Optional[Any] = None
     processing_time: Optional[float] = None
     security_status: Optional[str] = None
+    slot: Optional[int] = None  # Слот в таблице активных запросов координатора
     
     def __post_init__(self):
         if self.modules_responses is None:
@@ -45,14 +80,36 @@ class Coordinator:
         
         # Состояние системы
         self.is_running = False
-        self.active_requests = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         self.system_context = {}
         
+        # Активные запросы: предвыделенный массив слотов со стеком свободных
+        # индексов; при переполнении запросы учитываются в словаре
+        max_inflight = config.get('max_inflight_requests', 1024)
+        self._request_slots: List[Optional[ProcessingContext]] = [None] * max_inflight
+        self._free_slots: List[int] = list(range(max_inflight - 1, -1, -1))
+        self.active_requests: Dict[str, ProcessingContext] = {}
+        
+        # Таблица маршрутизации (тип ввода, намерение) -> модули
+        self._route_table = self._build_route_table()
+        
+        # Ограничения маршрутизации к модулям
+        self._module_semaphore = asyncio.Semaphore(config.get('max_parallel_modules', 16))
+        self.module_timeout = config.get('module_timeout', 30.0)
+        self.routing_timeout = config.get('routing_timeout', 30.0)
+        
+        # Генератор ID запросов: случайный префикс экземпляра + счетчик
+        self._id_prefix = secrets.token_hex(4)
+        self._id_counter = itertools.count()
+        
         self.logger.info("Координатор инициализирован")
 
     async def initialize(self):
         """Инициализация всех компонентов координатора"""
         try:
+            # Монотонные часы цикла событий для замеров времени обработки
+            self._loop = asyncio.get_running_loop()
+            
             # Инициализация компонентов
             from .communication_bus import CommunicationBus
             from .intent_analyzer import IntentAnalyzer
@@ -83,9 +140,15 @@ class Coordinator:
             self.logger.info("Все компоненты координатора успешно инициализированы")
             
         except Exception as e:
-            self.logger.error(f"Ошибка инициализации координатора: {e}")
+            self.logger.error("Ошибка инициализации координатора: %s", e)
             raise
 
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Цикл событий координатора; если initialize() не вызывался, запоминается текущий"""
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        return self._loop
+
     async def process_request(self, user_input: Any, input_type: str = 'text', user_context: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Основной метод обработки запроса
@@ -98,8 +161,9 @@ class Coordinator:
         Returns:
             Dict с результатом обработки
         """
-        start_time = time.time()
-        request_id = str(uuid.uuid4())
+        loop = self._get_loop()
+        start_time = loop.time()
+        request_id = f"{self._id_prefix}-{next(self._id_counter):x}"
         
         # Создаем контекст обработки
         context = ProcessingContext(
@@ -109,8 +173,8 @@ class Coordinator:
             context=user_context or {}
         )
         
-        self.active_requests[request_id] = context
-        self.logger.info(f"Начало обработки запроса {request_id}")
+        self._register_request(context)
+        self.logger.info("Начало обработки запроса %s", request_id)
         
         try:
             # 1. Проверка безопасности
@@ -135,10 +199,10 @@ class Coordinator:
             context.final_response = final_response
             
             # 5. Запись метрик производительности
-            context.processing_time = time.time() - start_time
+            context.processing_time = loop.time() - start_time
             await self.performance_monitor.record_request(context)
             
-            self.logger.info(f"Запрос {request_id} обработан за {context.processing_time:.2f}с")
+            self.logger.info("Запрос %s обработан за %.2fс", request_id, context.processing_time)
             
             return {
                 'request_id': request_id,
@@ -149,13 +213,34 @@ class Coordinator:
             }
             
         except Exception as e:
-            self.logger.error(f"Ошибка обработки запроса {request_id}: {e}")
+            self.logger.error("Ошибка обработки запроса %s: %s", request_id, e)
             return await self._create_error_response(context, str(e))
             
         finally:
             # Очистка
-            if request_id in self.active_requests:
-                del self.active_requests[request_id]
+            self._release_request(context)
+
+    def _register_request(self, context: ProcessingContext):
+        """Регистрация запроса в таблице активных запросов"""
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._request_slots[slot] = context
+            context.slot = slot
+        else:
+            self.active_requests[context.request_id] = context
+
+    def _release_request(self, context: ProcessingContext):
+        """Освобождение слота завершенного запроса"""
+        if context.slot is not None:
+            self._request_slots[context.slot] = None
+            self._free_slots.append(context.slot)
+            context.slot = None
+        else:
+            self.active_requests.pop(context.request_id, None)
+
+    def _active_requests_count(self) -> int:
+        """Количество запросов в обработке"""
+        return len(self._request_slots) - len(self._free_slots) + len(self.active_requests)
 
     async def _route_to_modules(self, context: ProcessingContext) -> Dict[str, Any]:
         """Маршрутизация запроса к соответствующим модулям"""
@@ -165,62 +250,85 @@ class Coordinator:
             # Определяем какие модули должны обработать запрос
             target_modules = await self._determine_target_modules(context)
             
-            # Отправляем запросы модулям через шину сообщений
-            tasks = []
-            for module_name in target_modules:
-                task = self.communication_bus.send_to_module(
-                    module_name=module_name,
-                    message_type=f"process_{context.input_type}",
-                    data={
-                        'input': context.user_input,
-                        'intent': context.intent,
-                        'entities': context.entities,
-                        'context': context.context
-                    }
-                )
-                tasks.append(task)
+            if not target_modules:
+                return modules_result
             
-            # Ждем ответы от всех модулей
-            responses = await asyncio.gather(*tasks, return_exceptions=True)
+            # Отправляем запросы модулям через шину сообщений; по истечении
+            # общего дедлайна группа задач отменяет отстающие модули
+            tasks = {}
+            try:
+                async with asyncio.timeout(self.routing_timeout):
+                    async with asyncio.TaskGroup() as task_group:
+                        for module_name in target_modules:
+                            tasks[module_name] = task_group.create_task(self._call_module(module_name, context))
+            except TimeoutError:
+                self.logger.warning("Истек дедлайн маршрутизации запроса %s", context.request_id)
             
             # Собираем результаты
-            for i, module_name in enumerate(target_modules):
-                if isinstance(responses[i], Exception):
-                    self.logger.error(f"Ошибка модуля {module_name}: {responses[i]}")
-                    modules_result[module_name] = {'error': str(responses[i])}
+            for module_name, task in tasks.items():
+                if task.cancelled():
+                    self.logger.warning("Модуль %s не ответил до дедлайна маршрутизации", module_name)
+                    modules_result[module_name] = {'error': 'deadline'}
                 else:
-                    modules_result[module_name] = responses[i]
+                    modules_result[module_name] = task.result()
                     
         except Exception as e:
-            self.logger.error(f"Ошибка маршрутизации: {e}")
+            self.logger.error("Ошибка маршрутизации: %s", e)
             
         return modules_result
 
-    async def _determine_target_modules(self, context: ProcessingContext) -> List[str]:
-        """Определение целевых модулей для обработки запроса"""
-        base_modules = []
-        
-        # Базовые модули в зависимости от типа ввода
-        if context.input_type == 'text':
-            base_modules = ['text_understander', 'memory_short_term']
-        elif context.input_type == 'audio':
-            base_modules = ['speech_recognizer', 'text_understander', 'memory_short_term']
-        elif context.input_type == 'image':
-            base_modules = ['visual_processor', 'memory_short_term']
-        
-        # Добавляем модули в зависимости от намерения
-        intent_modules = {
-            'weather': ['search_agent', 'api_caller'],
-            'calculation': ['logic_analyzer'],
-            'creative': ['creativity'],
-            'planning': ['task_planner', 'goals'],
-            'emotional': ['emotional_engine']
-        }
-        
-        if context.intent in intent_modules:
-            base_modules.extend(intent_modules[context.intent])
+    async def _call_module(self, module_name: str, context: ProcessingContext) -> Any:
+        """
+        Запрос к модулю с ограничением параллелизма и таймаутом
         
-        return list(set(base_modules))  # Убираем дубликаты
+        Ошибки модуля возвращаются как {'error': ...}, чтобы не отменять
+        запросы к остальным модулям группы.
+        """
+        async with self._module_semaphore:
+            try:
+                return await asyncio.wait_for(
+                    self.communication_bus.send_to_module(
+                        module_name=module_name,
+                        message_type=f"process_{context.input_type}",
+                        data={
+                            'input': context.user_input,
+                            'intent': context.intent,
+                            'entities': context.entities,
+                            'context': context.context
+                        }
+                    ),
+                    timeout=self.module_timeout
+                )
+            except asyncio.TimeoutError:
+                self.logger.error("Таймаут ожидания ответа модуля %s", module_name)
+                return {'error': 'timeout'}
+            except Exception as e:
+                self.logger.error("Ошибка модуля %s: %s", module_name, e)
+                return {'error': str(e)}
+
+    async def _determine_target_modules(self, context: ProcessingContext) -> Tuple[str, ...]:
+        """Определение целевых модулей для обработки запроса"""
+        route = self._route_table.get((context.input_type, context.intent))
+        if route is None:
+            # Неизвестный тип ввода или намерение без специализированных модулей
+            input_type = context.input_type if (context.input_type, None) in self._route_table else None
+            intent = context.intent if (None, context.intent) in self._route_table else None
+            route = self._route_table[(input_type, intent)]
+        return route
+
+    def _build_route_table(self) -> Dict[Tuple[Optional[str], Optional[str]], Tuple[str, ...]]:
+        """Предрасчет целевых модулей для каждой пары (тип ввода, намерение)"""
+        # Имена модулей приводятся к тому же каноничному виду, что и в ModuleManager:
+        # ключи modules_responses сравниваются синтезатором ответа без lower()
+        route_table = {}
+        for input_type in (*_BASE_MODULES, None):
+            base_modules = tuple(map(canonical_module_name, _BASE_MODULES.get(input_type, ())))
+            route_table[(input_type, None)] = base_modules
+            for intent, intent_modules in _INTENT_MODULES.items():
+                # dict.fromkeys убирает дубликаты с сохранением порядка
+                intent_modules = tuple(map(canonical_module_name, intent_modules))
+                route_table[(input_type, intent)] = tuple(dict.fromkeys(base_modules + intent_modules))
+        return route_table
 
     async def _create_error_response(self, context: ProcessingContext, error_msg: str) -> Dict[str, Any]:
         """Создание ответа об ошибке"""
@@ -245,6 +353,8 @@ class Coordinator:
             await self.communication_bus.shutdown()
         if self.performance_monitor:
             await self.performance_monitor.shutdown()
+        if self.intent_analyzer:
+            await self.intent_analyzer.shutdown()
             
         self.logger.info("Координатор завершил работу")
 
@@ -252,7 +362,7 @@ class Coordinator:
         """Получение статуса системы"""
         return {
             'is_running': self.is_running,
-            'active_requests': len(self.active_requests),
+            'active_requests': self._active_requests_count(),
             'components': {
                 'communication_bus': self.communication_bus is not None,
                 'security_gateway': self.security_gateway is not None,
@@ -3,12 +3,32 @@
 Определяет цель и сущности в запросе пользователя
 """
 
+import asyncio
 import logging
 import re
-from typing import Dict, Any, List, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple
 import json
 import yaml
 
+try:
+    # Линейный по времени движок RE2 (без бэктрекинга) для пользовательского ввода
+    import re2
+    HAS_RE2 = True
+except ImportError:
+    re2 = None
+    HAS_RE2 = False
+
+# Паттерны сущностей, специфичных для намерений
+_LOCATION_PATTERNS = [
+    re.compile(r'\b(в|на|у)\s+([А-Яа-яЁё\w\s-]+)', re.IGNORECASE),
+    re.compile(r'\b(москв[аеуы]|санкт-петербург[ае]|питер[ае]?)', re.IGNORECASE),
+]
+_MATH_PATTERNS = [
+    re.compile(r'\d+\s*[\+\-\*\/]\s*\d+', re.IGNORECASE),
+    re.compile(r'посчитай\s+([\d\s\+\-\*\/\(\)]+)', re.IGNORECASE),
+]
+
 class IntentAnalyzer:
     """Анализатор намерений пользователя"""
     
@@ -20,6 +40,18 @@ class IntentAnalyzer:
         self.intent_patterns = {}
         self.entity_patterns = {}
         
+        # Скомпилированные паттерны (строятся в _compile_patterns)
+        self._intent_res: Dict[str, List[Any]] = {}
+        self._entity_re: Dict[str, re.Pattern] = {}
+        
+        # Длинные тексты анализируются в пуле потоков, чтобы не блокировать
+        # цикл событий; короткие - сразу, без накладных расходов на передачу
+        self.offload_threshold = config.get('offload_threshold', 256)
+        self._executor = ThreadPoolExecutor(
+            max_workers=config.get('workers', 4),
+            thread_name_prefix='intent_analyzer'
+        )
+        
         # Модель для классификации (может быть заменена на ML модель)
         self.intent_model = None
         
@@ -38,7 +70,7 @@ class IntentAnalyzer:
             self.logger.info("Анализатор намерений инициализирован")
             
         except Exception as e:
-            self.logger.error(f"Ошибка инициализации анализатора намерений: {e}")
+            self.logger.error("Ошибка инициализации анализатора намерений: %s", e)
             raise
 
     async def analyze(self, context) -> Dict[str, Any]:
@@ -57,23 +89,20 @@ class IntentAnalyzer:
         user_input = context.user_input
         input_type = context.input_type
         
-        self.logger.debug(f"Анализ намерения для: {user_input}")
+        self.logger.debug("Анализ намерения для: %s", user_input)
         
         try:
-            # Предобработка в зависимости от типа ввода
-            if input_type == 'text':
-                processed_text = self._preprocess_text(user_input)
-            elif input_type == 'audio':
-                # Для аудио предполагаем, что уже есть текст от speech_recognizer
-                processed_text = self._preprocess_text(user_input)
-            else:
-                processed_text = ""
-            
-            # Определение намерения
-            intent, confidence = await self._detect_intent(processed_text)
+            # Для аудио предполагаем, что уже есть текст от speech_recognizer
+            text = user_input if input_type in ('text', 'audio') else ""
             
-            # Извлечение сущностей
-            entities = await self._extract_entities(processed_text, intent)
+            # Предобработка, определение намерения и извлечение сущностей
+            if len(text) > self.offload_threshold:
+                loop = asyncio.get_running_loop()
+                processed_text, intent, confidence, entities = await loop.run_in_executor(
+                    self._executor, self._analyze_text, text
+                )
+            else:
+                processed_text, intent, confidence, entities = self._analyze_text(text)
             
             result = {
                 'intent': intent,
@@ -82,11 +111,11 @@ class IntentAnalyzer:
                 'processed_text': processed_text
             }
             
-            self.logger.info(f"Определено намерение: {intent} (уверенность: {confidence:.2f})")
+            self.logger.info("Определено намерение: %s (уверенность: %.2f)", intent, confidence)
             return result
             
         except Exception as e:
-            self.logger.error(f"Ошибка анализа намерения: {e}")
+            self.logger.error("Ошибка анализа намерения: %s", e)
             return {
                 'intent': 'unknown',
                 'confidence': 0.0,
@@ -94,24 +123,32 @@ class IntentAnalyzer:
                 'error': str(e)
             }
 
-    async def _detect_intent(self, text: str) -> Tuple[str, float]:
-        """Определение намерения на основе текста"""
-        text_lower = text.lower()
+    def _analyze_text(self, text: str) -> Tuple[str, str, float, Dict[str, Any]]:
+        """
+        Полный анализ текста за один вызов
         
-        # Проверка паттернов для каждого намерения
+        Returns:
+            (обработанный текст, намерение, уверенность, сущности)
+        """
+        processed_text = self._preprocess_text(text)
+        intent, confidence = self._detect_intent(processed_text)
+        entities = self._extract_entities(processed_text, intent)
+        return processed_text, intent, confidence, entities
+
+    def _detect_intent(self, text: str) -> Tuple[str, float]:
+        """Определение намерения на основе текста"""
+        # Считаем, сколько разных паттернов каждого намерения сработало;
+        # каждый паттерн ищется отдельно, чтобы пересекающиеся совпадения
+        # разных паттернов не терялись
         intents_scores = {}
-        
-        for intent, patterns in self.intent_patterns.items():
-            score = 0
-            for pattern in patterns:
-                if re.search(pattern, text_lower, re.IGNORECASE):
-                    score += 1
-            
+        for intent, patterns in self._intent_res.items():
+            score = sum(1 for pattern in patterns if pattern.search(text))
             if score > 0:
                 intents_scores[intent] = score
         
         if intents_scores:
-            # Выбираем намерение с наибольшим счетом
+            # Выбираем намерение с наибольшим счетом; при равенстве побеждает
+            # объявленное раньше (словарь сохраняет порядок объявления)
             best_intent = max(intents_scores, key=intents_scores.get)
             confidence = min(intents_scores[best_intent] / 5.0, 1.0)  # Нормализуем до 0-1
             return best_intent, confidence
@@ -119,54 +156,38 @@ class IntentAnalyzer:
         # Если не нашли - возвращаем unknown
         return 'unknown', 0.1
 
-    async def _extract_entities(self, text: str, intent: str) -> Dict[str, Any]:
+    def _extract_entities(self, text: str, intent: str) -> Dict[str, Any]:
         """Извлечение сущностей из текста"""
         entities = {}
-        text_lower = text.lower()
         
-        # Извлечение общих сущностей
-        for entity_type, patterns in self.entity_patterns.items():
-            for pattern in patterns:
-                matches = re.finditer(pattern, text, re.IGNORECASE)
-                for match in matches:
-                    if entity_type not in entities:
-                        entities[entity_type] = []
-                    entities[entity_type].append(match.group())
+        # Извлечение общих сущностей: один проход на тип сущности
+        for entity_type, pattern in self._entity_re.items():
+            found = [match.group() for match in pattern.finditer(text)]
+            if found:
+                entities[entity_type] = found
         
         # Извлечение специфичных для намерения сущностей
-        intent_specific_entities = await self._extract_intent_specific_entities(text, intent)
+        intent_specific_entities = self._extract_intent_specific_entities(text, intent)
         entities.update(intent_specific_entities)
         
         return entities
 
-    async def _extract_intent_specific_entities(self, text: str, intent: str) -> Dict[str, Any]:
+    def _extract_intent_specific_entities(self, text: str, intent: str) -> Dict[str, Any]:
         """Извлечение сущностей специфичных для намерения"""
         entities = {}
         
         if intent == 'weather':
             # Извлечение локации и времени для погоды
-            location_patterns = [
-                r'\b(в|на|у)\s+([А-Яа-яЁё\w\s-]+)',
-                r'\b(москв[аеуы]|санкт-петербург[ае]|питер[ае]?)',
-            ]
-            
-            for pattern in location_patterns:
-                matches = re.finditer(pattern, text, re.IGNORECASE)
-                for match in matches:
+            for pattern in _LOCATION_PATTERNS:
+                for match in pattern.finditer(text):
                     if 'location' not in entities:
                         entities['location'] = []
                     entities['location'].append(match.group())
         
         elif intent == 'calculation':
             # Извлечение математических выражений
-            math_patterns = [
-                r'\d+\s*[\+\-\*\/]\s*\d+',
-                r'посчитай\s+([\d\s\+\-\*\/\(\)]+)'
-            ]
-            
-            for pattern in math_patterns:
-                matches = re.finditer(pattern, text, re.IGNORECASE)
-                for match in matches:
+            for pattern in _MATH_PATTERNS:
+                for match in pattern.finditer(text):
                     if 'expression' not in entities:
                         entities['expression'] = []
                     entities['expression'].append(match.group())
@@ -175,8 +196,8 @@ class IntentAnalyzer:
 
     def _preprocess_text(self, text: str) -> str:
         """Предобработка текста"""
-        # Удаление лишних пробелов
-        text = re.sub(r'\s+', ' ', text).strip()
+        # Удаление лишних пробелов (split/join эквивалентен замене \s+ и strip)
+        text = ' '.join(text.split())
         
         # Приведение к нижнему регистру для анализа
         # (но сохраняем оригинал для сущностей)
@@ -242,8 +263,34 @@ class IntentAnalyzer:
             ]
         }
         
+        self._compile_patterns()
         self.logger.debug("Паттерны намерений и сущностей загружены")
 
+    def _compile_patterns(self):
+        """Предкомпиляция паттернов намерений и сущностей"""
+        # Паттерны намерений компилируются по отдельности в порядке объявления
+        self._intent_res = {
+            intent: [self._compile_intent_regex(pattern) for pattern in patterns]
+            for intent, patterns in self.intent_patterns.items()
+            if patterns
+        }
+        
+        # Паттерны одного типа сущности объединяются в одну альтернативу
+        self._entity_re = {
+            entity_type: re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE)
+            for entity_type, patterns in self.entity_patterns.items()
+            if patterns
+        }
+
+    def _compile_intent_regex(self, pattern: str):
+        """Компиляция паттерна намерения (RE2, если доступен)"""
+        if HAS_RE2 and self.config.get('regex_engine', 're2') == 're2':
+            try:
+                return re2.compile(f"(?i){pattern}")
+            except Exception as e:
+                self.logger.warning("RE2 не поддерживает паттерны намерений, используется re: %s", e)
+        return re.compile(pattern, re.IGNORECASE)
+
     async def update_patterns(self, new_patterns: Dict[str, Any]):
         """Обновление паттернов анализатора"""
         if 'intents' in new_patterns:
@@ -251,8 +298,15 @@ class IntentAnalyzer:
         if 'entities' in new_patterns:
             self.entity_patterns.update(new_patterns['entities'])
         
+        self._compile_patterns()
         self.logger.info("Паттерны анализатора обновлены")
 
+    async def shutdown(self):
+        """Корректное завершение работы анализатора"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.is_initialized = False
+        self.logger.info("Анализатор намерений завершил работу")
+
     async def get_analysis_stats(self) -> Dict[str, Any]:
         """Получение статистики анализатора"""
         return {
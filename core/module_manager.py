@@ -4,12 +4,15 @@
 """
 
 import asyncio
+import functools
 import logging
 import importlib
-from typing import Dict, Any, List, Optional, Type
+import os
+import sys
+from collections import deque
+from typing import Dict, Any, List, Optional, Set, Tuple, Type
 from pathlib import Path
-import yaml
-import json
+from types import MappingProxyType
 
 # Mapping модулей на их пакеты - ИСПРАВЛЕННЫЕ ПУТИ
 MODULE_PATHS = {
@@ -79,13 +82,55 @@ MODULE_CLASS_NAMES = {
     'action_executor': 'ActionExecutor',
 }
 
+@functools.lru_cache(maxsize=128)
+def _default_class_name(module_name: str) -> str:
+    """Имя класса по умолчанию: memory_short_term -> MemoryShortTerm"""
+    return module_name.replace('_', ' ').title().replace(' ', '')
+
+# Объединенная таблица: имя модуля -> (путь пакета, имя класса)
+MODULE_SPECS: Dict[str, Tuple[str, str]] = {
+    name: (path, MODULE_CLASS_NAMES[name] if name in MODULE_CLASS_NAMES else _default_class_name(name))
+    for name, path in MODULE_PATHS.items()
+}
+
+# Исходные таблицы остаются доступны только для чтения
+MODULE_PATHS = MappingProxyType(MODULE_PATHS)
+MODULE_CLASS_NAMES = MappingProxyType(MODULE_CLASS_NAMES)
+
+def canonical_module_name(name: str) -> str:
+    """
+    Каноничное имя модуля: нижний регистр, интернированная строка
+    
+    Все имена модулей (файлы конфигурации, зависимости, список enabled,
+    аргументы публичных методов) приводятся к этому виду при регистрации,
+    поэтому ключи реестров совпадают независимо от написания.
+    """
+    return sys.intern(str(name).lower())
+
+# Кэш импортированных классов модулей: "путь:класс" -> класс
+_IMPORT_CACHE: Dict[str, Type] = {}
+
 class ModuleManager:
     """Менеджер модулей системы"""
     
+    __slots__ = (
+        'config', 'logger', 'loaded_modules', 'module_states', 'module_dependencies',
+        'is_initialized', '_dependents', '_cyclic_modules', '_yaml_cache', '_init_sem',
+        '_self_status_base', '_loading',
+    )
+    
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.logger = logging.getLogger('core.module_manager')
         
+        # Переданные заранее конфигурации модулей хранятся под каноничными именами
+        modules_cfg = config.get('modules')
+        if isinstance(modules_cfg, dict):
+            config['modules'] = {
+                canonical_module_name(module_name): self._canonicalize_dependencies(module_config)
+                for module_name, module_config in modules_cfg.items()
+            }
+        
         # Реестр загруженных модулей
         self.loaded_modules: Dict[str, Any] = {}
         
@@ -95,32 +140,65 @@ class ModuleManager:
         # Зависимости между модулями
         self.module_dependencies: Dict[str, List[str]] = {}
         
+        # Обратный индекс зависимостей: модуль -> модули, которые от него зависят
+        self._dependents: Dict[str, Set[str]] = {}
+        
+        # Модули, лежащие на циклах зависимостей (их загрузка отклоняется)
+        self._cyclic_modules: Set[str] = set()
+        
+        # Кэш разобранных YAML-файлов: путь -> (mtime_ns, размер, конфигурация)
+        self._yaml_cache: Dict[str, Tuple[int, int, Any]] = {}
+        
+        # Модули в процессе загрузки: повторный запрос ждет уже идущую загрузку
+        self._loading: Dict[str, asyncio.Future] = {}
+        
+        # Ограничение числа одновременно инициализируемых модулей
+        self._init_sem = asyncio.Semaphore(config.get('max_parallel_inits', 8))
+        
         # СРАЗУ РЕГИСТРИРУЕМ СЕБЯ КАК ЗАГРУЖЕННЫЙ МОДУЛЬ
         self.loaded_modules['module_manager'] = self
         self.module_states['module_manager'] = 'loaded'
+        self._self_status_base = {'name': 'module_manager'}
         
         self.is_initialized = False
 
     async def initialize(self):
         """Инициализация менеджера модулей"""
         try:
-            # Загрузка конфигурации модулей
-            await self._load_module_configs()
-        
             # ИСКЛЮЧАЕМ СЕБЯ ИЗ СПИСКА ДЛЯ ЗАГРУЗКИ (избегаем циклической зависимости)
-            enabled_modules = [
-                module for module in self.config.get('enabled', []) 
+            enabled_modules = list(dict.fromkeys(
+                module for module in map(canonical_module_name, self.config.get('enabled', []))
                 if module != 'module_manager'
-            ]
+            ))
             
-            self.logger.info(f"Загрузка {len(enabled_modules)} включенных модулей: {enabled_modules}")
-        
-            for module_name in enabled_modules:
-                success = await self.load_module(module_name)
-                if success:
-                    self.logger.info(f"✅ Модуль {module_name} успешно загружен")
-                else:
-                    self.logger.error(f"❌ Ошибка загрузки модуля {module_name}")
+            # Загрузка конфигурации модулей; пакеты известных модулей
+            # импортируются в потоках параллельно с разбором YAML
+            await asyncio.gather(
+                self._load_module_configs(),
+                *(
+                    asyncio.to_thread(self._preload_module, MODULE_SPECS[module][0])
+                    for module in enabled_modules if module in MODULE_SPECS
+                )
+            )
+            
+            self.logger.info("Загрузка %s включенных модулей: %s", len(enabled_modules), enabled_modules)
+        
+            # Модули одного слоя не зависят друг от друга и загружаются параллельно;
+            # зависимости уже обработаны в предыдущих слоях и повторно не загружаются
+            layers, cyclic_modules = self._dependency_layers(enabled_modules)
+            for layer in layers:
+                results = await asyncio.gather(*(
+                    self._load_module_once(module_name, None, load_dependencies=False)
+                    for module_name in layer
+                ))
+                for module_name, success in zip(layer, results):
+                    self._log_load_result(module_name, success)
+            
+            # Модули с циклическими зависимостями загружаются последовательно
+            if cyclic_modules:
+                self.logger.warning("Модули, связанные с циклическими зависимостями: %s", cyclic_modules)
+                for module_name in cyclic_modules:
+                    self._log_load_result(module_name, await self.load_module(module_name))
         
             # ОБНОВЛЯЕМ СВОЙ СТАТУС
             self.module_states['module_manager'] = 'initialized'
@@ -128,10 +206,61 @@ class ModuleManager:
             self.logger.info("✅ Менеджер модулей инициализирован")
         
         except Exception as e:
-            self.logger.error(f"❌ Ошибка инициализации менеджера модулей: {e}")
+            self.logger.error("❌ Ошибка инициализации менеджера модулей: %s", e)
             self.module_states['module_manager'] = 'error'
             raise
 
+    def _log_load_result(self, module_name: str, success: bool):
+        """Запись результата загрузки модуля в лог"""
+        if success:
+            self.logger.info("✅ Модуль %s успешно загружен", module_name)
+        else:
+            self.logger.error("❌ Ошибка загрузки модуля %s", module_name)
+
+    def _dependency_layers(self, module_names: List[str]) -> Tuple[List[List[str]], List[str]]:
+        """
+        Разбиение модулей на слои загрузки по зависимостям (алгоритм Кана)
+        
+        Args:
+            module_names: Модули для загрузки (зависимости добавляются транзитивно)
+            
+        Returns:
+            Слои в порядке загрузки и модули, входящие в циклические зависимости
+        """
+        modules_config = self.config.get('modules', {})
+        
+        # Граф зависимостей вместе с транзитивными зависимостями
+        dependencies: Dict[str, List[str]] = {}
+        queue = list(module_names)
+        for module_name in queue:
+            if module_name in dependencies or module_name == 'module_manager':
+                continue
+            module_config = modules_config.get(module_name) or {}
+            deps = [dep for dep in dict.fromkeys(module_config.get('dependencies', [])) if dep != 'module_manager']
+            dependencies[module_name] = deps
+            queue.extend(deps)
+        
+        in_degree = {module_name: len(deps) for module_name, deps in dependencies.items()}
+        dependents: Dict[str, List[str]] = {}
+        for module_name, deps in dependencies.items():
+            for dep in deps:
+                dependents.setdefault(dep, []).append(module_name)
+        
+        layers = []
+        layer = [module_name for module_name, degree in in_degree.items() if degree == 0]
+        while layer:
+            layers.append(layer)
+            next_layer = []
+            for module_name in layer:
+                for dependent in dependents.get(module_name, ()):
+                    in_degree[dependent] -= 1
+                    if in_degree[dependent] == 0:
+                        next_layer.append(dependent)
+            layer = next_layer
+        
+        cyclic_modules = [module_name for module_name, degree in in_degree.items() if degree > 0]
+        return layers, cyclic_modules
+
     async def load_module(self, module_name: str, module_config: Dict[str, Any] = None) -> bool:
         """
         Загрузка модуля по имени
@@ -143,12 +272,47 @@ class ModuleManager:
         Returns:
             True если модуль успешно загружен
         """
-        if module_name in self.loaded_modules:
-            self.logger.warning(f"Модуль {module_name} уже загружен")
+        return await self._load_module_once(canonical_module_name(module_name), module_config)
+
+    async def _load_module_once(self, module_name: str, module_config: Optional[Dict[str, Any]] = None,
+                                load_dependencies: bool = True) -> bool:
+        """
+        Загрузка модуля с защитой от параллельной загрузки одного и того же модуля
+        
+        Если модуль уже загружается (например, как общая зависимость двух
+        модулей слоя), повторный вызов ждет результат идущей загрузки.
+        """
+        pending = self._loading.get(module_name)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._loading[module_name] = future
+        result = False
+        try:
+            result = await self._load_module(module_name, module_config, load_dependencies)
+            return result
+        finally:
+            del self._loading[module_name]
+            future.set_result(result)
+
+    async def _load_module(self, module_name: str, module_config: Optional[Dict[str, Any]],
+                           load_dependencies: bool) -> bool:
+        """Загрузка модуля (имя уже каноничное)"""
+        loaded = self.loaded_modules
+        logger = self.logger
+        if module_name in loaded:
+            logger.warning("Модуль %s уже загружен", module_name)
             return True
         
+        # Рекурсивная загрузка зависимостей на цикле никогда не завершилась бы
+        if module_name in self._cyclic_modules:
+            logger.error("❌ Модуль %s входит в циклическую зависимость и не будет загружен", module_name)
+            self.module_states[module_name] = 'error'
+            return False
+        
         try:
-            self.logger.info(f"Загрузка модуля: {module_name}")
+            logger.info("Загрузка модуля: %s", module_name)
             
             # Получаем конфигурацию модуля
             if module_config is None:
@@ -157,9 +321,15 @@ class ModuleManager:
             # Проверяем зависимости
             dependencies = module_config.get('dependencies', [])
             for dep in dependencies:
-                if dep not in self.loaded_modules:
-                    self.logger.info(f"Загрузка зависимости {dep} для модуля {module_name}")
-                    await self.load_module(dep)
+                if dep in loaded:
+                    continue
+                if not load_dependencies:
+                    # Послойная загрузка: зависимость из предыдущего слоя не загрузилась
+                    logger.error("❌ Зависимость %s модуля %s не загружена", dep, module_name)
+                    self.module_states[module_name] = 'error'
+                    return False
+                logger.info("Загрузка зависимости %s для модуля %s", dep, module_name)
+                await self._load_module_once(dep)
             
             # Динамическая загрузка модуля
             module_class = await self._import_module_class(module_name, module_config)
@@ -169,17 +339,18 @@ class ModuleManager:
             
             # Инициализация модуля
             if hasattr(module_instance, 'initialize'):
-                await module_instance.initialize()
+                async with self._init_sem:
+                    await module_instance.initialize()
             
             # Регистрируем модуль
-            self.loaded_modules[module_name] = module_instance
+            loaded[module_name] = module_instance
             self.module_states[module_name] = 'initialized'
             
-            self.logger.info(f"✅ Модуль {module_name} успешно загружен и инициализирован")
+            logger.info("✅ Модуль %s успешно загружен и инициализирован", module_name)
             return True
             
         except Exception as e:
-            self.logger.error(f"❌ Ошибка загрузки модуля {module_name}: {e}")
+            logger.error("❌ Ошибка загрузки модуля %s: %s", module_name, e)
             self.module_states[module_name] = 'error'
             return False
 
@@ -193,8 +364,11 @@ class ModuleManager:
         Returns:
             True если модуль успешно выгружен
         """
-        if module_name not in self.loaded_modules:
-            self.logger.warning(f"Модуль {module_name} не загружен")
+        module_name = canonical_module_name(module_name)
+        loaded = self.loaded_modules
+        module_instance = loaded.get(module_name)
+        if module_instance is None:
+            self.logger.warning("Модуль %s не загружен", module_name)
             return True
         
         # НЕ ДАЕМ ВЫГРУЗИТЬ СЕБЯ
@@ -203,32 +377,31 @@ class ModuleManager:
             return False
         
         try:
-            self.logger.info(f"Выгрузка модуля: {module_name}")
+            self.logger.info("Выгрузка модуля: %s", module_name)
             
             # Проверяем зависимости других модулей
-            dependent_modules = []
-            for other_module, deps in self.module_dependencies.items():
-                if module_name in deps and other_module in self.loaded_modules:
-                    dependent_modules.append(other_module)
+            dependent_modules = [
+                other_module for other_module in self._dependents.get(module_name, ())
+                if other_module in loaded
+            ]
             
             if dependent_modules:
-                self.logger.warning(f"Модуль {module_name} требуется для: {dependent_modules}")
+                self.logger.warning("Модуль %s требуется для: %s", module_name, dependent_modules)
                 return False
             
             # Корректное завершение работы модуля
-            module_instance = self.loaded_modules[module_name]
             if hasattr(module_instance, 'shutdown'):
                 await module_instance.shutdown()
             
             # Удаляем из реестра
-            del self.loaded_modules[module_name]
+            del loaded[module_name]
             self.module_states[module_name] = 'unloaded'
             
-            self.logger.info(f"✅ Модуль {module_name} успешно выгружен")
+            self.logger.info("✅ Модуль %s успешно выгружен", module_name)
             return True
             
         except Exception as e:
-            self.logger.error(f"❌ Ошибка выгрузки модуля {module_name}: {e}")
+            self.logger.error("❌ Ошибка выгрузки модуля %s: %s", module_name, e)
             return False
 
     async def reload_module(self, module_name: str) -> bool:
@@ -241,16 +414,20 @@ class ModuleManager:
         Returns:
             True если модуль успешно перезагружен
         """
+        module_name = canonical_module_name(module_name)
         # НЕ ДАЕМ ПЕРЕЗАГРУЗИТЬ СЕБЯ
         if module_name == 'module_manager':
             self.logger.warning("⚠️ Перезагрузка module_manager не поддерживается")
             return True
             
-        self.logger.info(f"Перезагрузка модуля: {module_name}")
+        self.logger.info("Перезагрузка модуля: %s", module_name)
         
         # Сохраняем конфигурацию
         module_config = self.config.get('modules', {}).get(module_name, {})
         
+        # Сбрасываем кэш класса, чтобы перезагрузка подхватила его заново
+        self._invalidate_import_cache(module_name, module_config)
+        
         # Выгружаем и загружаем заново
         if await self.unload_module(module_name):
             return await self.load_module(module_name, module_config)
@@ -267,6 +444,7 @@ class ModuleManager:
         Returns:
             Экземпляр модуля или None если не найден
         """
+        module_name = canonical_module_name(module_name)
         return self.loaded_modules.get(module_name)
 
     async def get_module_status(self, module_name: str) -> Dict[str, Any]:
@@ -279,21 +457,25 @@ class ModuleManager:
         Returns:
             Статус модуля
         """
-        if module_name not in self.loaded_modules:
-            return {'status': 'not_loaded'}
+        module_name = canonical_module_name(module_name)
+        loaded = self.loaded_modules
+        states = self.module_states
         
-        # ОСОБАЯ ОБРАБОТКА ДЛЯ САМОГО СЕБЯ
+        # ОСОБАЯ ОБРАБОТКА ДЛЯ САМОГО СЕБЯ (менеджер всегда зарегистрирован)
         if module_name == 'module_manager':
             return {
-                'status': self.module_states.get(module_name, 'unknown'),
-                'name': module_name,
-                'loaded_modules_count': len(self.loaded_modules),
+                **self._self_status_base,
+                'status': states['module_manager'],
+                'loaded_modules_count': len(loaded),
                 'is_initialized': self.is_initialized
             }
         
-        module_instance = self.loaded_modules[module_name]
+        module_instance = loaded.get(module_name)
+        if module_instance is None:
+            return {'status': 'not_loaded'}
+        
         status = {
-            'status': self.module_states.get(module_name, 'unknown'),
+            'status': states.get(module_name, 'unknown'),
             'name': module_name
         }
         
@@ -303,16 +485,22 @@ class ModuleManager:
                 module_status = await module_instance.get_status()
                 status.update(module_status)
             except Exception as e:
-                self.logger.warning(f"Не удалось получить статус модуля {module_name}: {e}")
+                self.logger.warning("Не удалось получить статус модуля %s: %s", module_name, e)
         
         return status
 
     async def get_all_modules_status(self) -> Dict[str, Dict[str, Any]]:
         """Получение статуса всех модулей"""
-        status = {}
-        for module_name in self.loaded_modules.keys():
-            status[module_name] = await self.get_module_status(module_name)
-        return status
+        # Модули опрашиваются параллельно
+        module_names = list(self.loaded_modules)
+        results = await asyncio.gather(
+            *(self.get_module_status(module_name) for module_name in module_names),
+            return_exceptions=True
+        )
+        return {
+            module_name: result if not isinstance(result, Exception) else {'status': 'error', 'error': str(result)}
+            for module_name, result in zip(module_names, results)
+        }
 
     async def _import_module_class(self, module_name: str, module_config: Dict[str, Any]) -> Type:
         """
@@ -326,58 +514,174 @@ class ModuleManager:
             Класс модуля
         """
         try:
-            # Используем mapping для определения пути
-            if module_name in MODULE_PATHS:
-                module_path = MODULE_PATHS[module_name]
-                class_name = MODULE_CLASS_NAMES.get(module_name, f"{module_name.capitalize()}")
-            else:
-                # Fallback: пытаемся получить из конфигурации
-                module_path = module_config.get('path', f"modules.{module_name}")
-                class_name = module_config.get('class_name', f"{module_name.capitalize()}")
+            module_path, class_name = self._resolve_module_spec(module_name, module_config)
+            
+            cache_key = f"{module_path}:{class_name}"
+            module_class = _IMPORT_CACHE.get(cache_key)
+            if module_class is not None:
+                return module_class
             
-            self.logger.debug(f"Импорт модуля {module_name} из {module_path}.{class_name}")
+            self.logger.debug("Импорт модуля %s из %s.%s", module_name, module_path, class_name)
             
-            # Импортируем модуль
-            module = importlib.import_module(module_path)
+            # Уже импортированный модуль берется из sys.modules без захвата блокировки импорта
+            module = sys.modules.get(module_path) or importlib.import_module(module_path)
             
             # Получаем класс
             module_class = getattr(module, class_name)
             
+            _IMPORT_CACHE[cache_key] = module_class
             return module_class
             
         except ImportError as e:
-            self.logger.error(f"❌ Не удалось импортировать модуль {module_name} из {module_path}: {e}")
+            self.logger.error("❌ Не удалось импортировать модуль %s из %s: %s", module_name, module_path, e)
             raise
         except AttributeError as e:
-            self.logger.error(f"❌ Не найден класс {class_name} в модуле {module_path}: {e}")
+            self.logger.error("❌ Не найден класс %s в модуле %s: %s", class_name, module_path, e)
             raise
 
+    def _preload_module(self, module_path: str):
+        """Предварительный импорт пакета модуля (выполняется вне цикла событий)"""
+        try:
+            importlib.import_module(module_path)
+        except Exception as e:
+            # Ошибку сообщит последующий load_module
+            self.logger.debug("Предзагрузка %s не удалась: %s", module_path, e)
+
+    def _resolve_module_spec(self, module_name: str, module_config: Dict[str, Any]) -> Tuple[str, str]:
+        """Определение пути и имени класса модуля"""
+        # Используем mapping для определения пути
+        spec = MODULE_SPECS.get(module_name)
+        if spec is not None:
+            return spec
+        
+        # Fallback: пытаемся получить из конфигурации
+        module_path = module_config.get('path', f"modules.{module_name}")
+        class_name = module_config.get('class_name') or _default_class_name(module_name)
+        return module_path, class_name
+
+    def _invalidate_import_cache(self, module_name: str, module_config: Dict[str, Any]):
+        """Удаление класса модуля из кэша импорта"""
+        module_path, class_name = self._resolve_module_spec(module_name, module_config)
+        _IMPORT_CACHE.pop(f"{module_path}:{class_name}", None)
+
     async def _load_module_configs(self):
         """Загрузка конфигураций всех модулей"""
         modules_config_path = Path('config/modules/')
         
         if modules_config_path.exists():
-            for config_file in modules_config_path.glob('*.yaml'):
-                module_name = config_file.stem
+            # Чтение и разбор всех файлов выполняется одним заходом в отдельном потоке
+            configs = await asyncio.to_thread(self._read_all_configs, modules_config_path)
+            modules_cfg = self.config.setdefault('modules', {})
+            
+            for module_name, module_config in configs.items():
+                # Сохраняем в общую конфигурацию
+                modules_cfg[module_name] = module_config
+                
+                # Сохраняем зависимости
+                if module_config and 'dependencies' in module_config:
+                    self._set_dependencies(module_name, module_config['dependencies'])
+                
+                self.logger.debug("Загружена конфигурация модуля: %s", module_name)
+        
+        self._check_dependency_cycles()
+        self.logger.info("✅ Конфигурации модулей загружены")
+
+    def _set_dependencies(self, module_name: str, dependencies: List[str]):
+        """Обновление зависимостей модуля и обратного индекса"""
+        dependencies = [canonical_module_name(dep) for dep in dependencies]
+        for dep in self.module_dependencies.get(module_name, ()):
+            dependents = self._dependents.get(dep)
+            if dependents is not None:
+                dependents.discard(module_name)
+        
+        if dependencies:
+            self.module_dependencies[module_name] = dependencies
+        else:
+            self.module_dependencies.pop(module_name, None)
+        
+        for dep in dependencies:
+            self._dependents.setdefault(dep, set()).add(module_name)
+
+    def _check_dependency_cycles(self):
+        """Предварительная проверка графа зависимостей на циклы (алгоритм Кана)"""
+        graph = self.module_dependencies
+        
+        in_degree: Dict[str, int] = {}
+        for module_name, deps in graph.items():
+            in_degree[module_name] = len(set(deps))
+            for dep in deps:
+                in_degree.setdefault(dep, 0)
+        
+        queue = deque(module_name for module_name, degree in in_degree.items() if degree == 0)
+        while queue:
+            for dependent in self._dependents.get(queue.popleft(), ()):
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    queue.append(dependent)
+        
+        # В остатке - модули на циклах и модули, зависящие от них;
+        # на цикле лежит только модуль, достижимый из самого себя
+        remaining = {module_name for module_name, degree in in_degree.items() if degree > 0}
+        cyclic_modules = set()
+        for module_name in remaining:
+            stack = [dep for dep in graph.get(module_name, ()) if dep in remaining]
+            seen = set()
+            while stack:
+                dep = stack.pop()
+                if dep == module_name:
+                    cyclic_modules.add(module_name)
+                    break
+                if dep not in seen:
+                    seen.add(dep)
+                    stack.extend(d for d in graph.get(dep, ()) if d in remaining)
+        
+        if cyclic_modules:
+            self.logger.error("❌ Циклические зависимости между модулями: %s", sorted(cyclic_modules))
+        self._cyclic_modules = cyclic_modules
+
+    def _read_all_configs(self, modules_config_path: Path) -> Dict[str, Any]:
+        """Чтение YAML-конфигураций модулей (выполняется вне цикла событий)"""
+        # PyYAML импортируется только при первом чтении конфигураций;
+        # C-реализация загрузчика из libyaml, если PyYAML собран с ней
+        import yaml
+        yaml_loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+        
+        configs = {}
+        # os.scandir отдает DirEntry с уже прочитанным типом файла, без Path на каждую запись
+        with os.scandir(modules_config_path) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.yaml') or not entry.is_file():
+                    continue
+                config_file = entry.path
+                # Имена модулей приводятся к каноничному виду (нижний регистр, интернирование)
+                # один раз при регистрации, а не при каждом запросе
+                module_name = canonical_module_name(entry.name[:-len('.yaml')])
                 try:
-                    with open(config_file, 'r', encoding='utf-8') as f:
-                        module_config = yaml.safe_load(f)
-                    
-                    # Сохраняем в общую конфигурацию
-                    if 'modules' not in self.config:
-                        self.config['modules'] = {}
-                    self.config['modules'][module_name] = module_config
-                    
-                    # Сохраняем зависимости
-                    if 'dependencies' in module_config:
-                        self.module_dependencies[module_name] = module_config['dependencies']
-                    
-                    self.logger.debug(f"Загружена конфигурация модуля: {module_name}")
+                    # Неизменившийся файл (те же mtime и размер) не разбирается повторно
+                    stat = entry.stat()
+                    cached = self._yaml_cache.get(config_file)
+                    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                        configs[module_name] = cached[2]
+                        continue
                     
+                    with open(config_file, 'rb') as f:
+                        module_config = yaml.load(f, Loader=yaml_loader)
+                    module_config = self._canonicalize_dependencies(module_config)
+                    self._yaml_cache[config_file] = (stat.st_mtime_ns, stat.st_size, module_config)
+                    configs[module_name] = module_config
                 except Exception as e:
-                    self.logger.error(f"❌ Ошибка загрузки конфигурации {config_file}: {e}")
-        
-        self.logger.info("✅ Конфигурации модулей загружены")
+                    self.logger.error("❌ Ошибка загрузки конфигурации %s: %s", config_file, e)
+        return configs
+
+    @staticmethod
+    def _canonicalize_dependencies(module_config: Any) -> Any:
+        """Приведение имен зависимостей к тому же виду, что и имена модулей"""
+        if isinstance(module_config, dict) and module_config.get('dependencies'):
+            module_config = dict(module_config)
+            module_config['dependencies'] = [
+                canonical_module_name(dep) for dep in module_config['dependencies']
+            ]
+        return module_config
 
     async def _get_module_config(self, module_name: str) -> Dict[str, Any]:
         """Получение конфигурации модуля"""
@@ -391,17 +695,18 @@ class ModuleManager:
             module_name: Имя модуля
             new_config: Новая конфигурация
         """
-        if 'modules' not in self.config:
-            self.config['modules'] = {}
-        
-        self.config['modules'][module_name] = new_config
+        module_name = canonical_module_name(module_name)
+        new_config = self._canonicalize_dependencies(new_config)
+        self.config.setdefault('modules', {})[module_name] = new_config
+        self._set_dependencies(module_name, new_config.get('dependencies', []))
+        self._check_dependency_cycles()
         
         # Если модуль загружен - перезагружаем его
         if module_name in self.loaded_modules and module_name != 'module_manager':
-            self.logger.info(f"Обновление конфигурации и перезагрузка модуля: {module_name}")
+            self.logger.info("Обновление конфигурации и перезагрузка модуля: %s", module_name)
             await self.reload_module(module_name)
         
-        self.logger.info(f"✅ Конфигурация модуля {module_name} обновлена")
+        self.logger.info("✅ Конфигурация модуля %s обновлена", module_name)
 
     async def shutdown(self):
         """Корректное завершение работы всех модулей"""
@@ -410,7 +715,7 @@ class ModuleManager:
         # Выгружаем модули в обратном порядке для учета зависимостей
         # ИСКЛЮЧАЕМ СЕБЯ ИЗ СПИСКА ВЫГРУЗКИ
         modules_to_unload = [
-            module for module in list(self.loaded_modules.keys())[::-1]
+            module for module in reversed(self.loaded_modules)
             if module != 'module_manager'
         ]
         
@@ -418,7 +723,7 @@ class ModuleManager:
             try:
                 await self.unload_module(module_name)
             except Exception as e:
-                self.logger.error(f"❌ Ошибка при выгрузке модуля {module_name}: {e}")
+                self.logger.error("❌ Ошибка при выгрузке модуля %s: %s", module_name, e)
         
         self.is_initialized = False
         self.logger.info("✅ Все модули выгружены")
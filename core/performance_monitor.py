@@ -6,14 +6,63 @@
 import logging
 import time
 import asyncio
-from typing import Dict, Any, List, Optional, Union
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice, takewhile
+from typing import TYPE_CHECKING, Deque, Dict, Any, List, Optional, Union
 from dataclasses import dataclass
 import psutil
 import json
 from datetime import datetime
 from pathlib import Path
 
-@dataclass
+if TYPE_CHECKING:
+    from .coordinator import ProcessingContext
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Минимальный интервал между опросами загрузки CPU (секунды): более частый
+# неблокирующий вызов cpu_percent дает шум, поэтому возвращается прошлое значение
+_CPU_SAMPLE_MIN_INTERVAL = 0.2
+
+# Время жизни закэшированного результата disk_usage (секунды)
+_DISK_USAGE_TTL = 300
+
+_METRICS_DIR = Path('data/runtime/performance_metrics')
+
+# Журнал метрик запросов: JSON Lines, новые записи дописываются пачками
+_REQUEST_METRICS_LOG = _METRICS_DIR / 'request_metrics.jsonl'
+
+# Прежний формат: полный JSON-массив, перезаписываемый целиком
+_LEGACY_REQUEST_METRICS = _METRICS_DIR / 'request_metrics.json'
+
+# Период сжатия журнала до последних записей (секунды)
+_METRICS_COMPACTION_INTERVAL = 3600
+
+def _json_dumps(obj: Any, indent: bool = False) -> bytes:
+    """Сериализация в JSON (через orjson, если он установлен)"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+_json_loads = orjson.loads if HAS_ORJSON else json.loads
+
+# Статус здоровья по числу сработавших порогов (CPU, память, доля ошибок), по 20 баллов за каждый
+_HEALTH_STATUS_BY_PENALTIES = ('healthy', 'healthy', 'degraded', 'unhealthy')
+
+# Временные диапазоны отчета о производительности (секунды)
+_REPORT_RANGES = {
+    '1h': 3600,
+    '24h': 86400,
+    '7d': 604800
+}
+
+@dataclass(slots=True)
 class PerformanceMetrics:
     """Метрики производительности"""
     timestamp: float
@@ -24,21 +73,140 @@ class PerformanceMetrics:
     cpu_usage: float
     error_count: int
 
+class _SlidingWindow:
+    """
+    Скользящее окно агрегатов метрик запросов
+    
+    Счетчики и суммы обновляются при добавлении и вытеснении записи,
+    максимум и минимум времени обработки - через монотонные очереди,
+    поэтому и обновление, и чтение занимают амортизированно O(1)
+    """
+    
+    __slots__ = (
+        'span', 'capacity', 'entries', 'count', 'errors',
+        'sum_time', 'sum_cpu', 'sum_memory', 'max_times', 'min_times', '_next_seq',
+    )
+    
+    def __init__(self, span: float, capacity: int):
+        self.span = span
+        self.capacity = capacity
+        self.entries: Deque[PerformanceMetrics] = deque()
+        self.count = 0
+        self.errors = 0
+        self.sum_time = 0.0
+        self.sum_cpu = 0.0
+        self.sum_memory = 0.0
+        # Пары (порядковый номер записи, время обработки)
+        self.max_times: Deque[tuple] = deque()
+        self.min_times: Deque[tuple] = deque()
+        self._next_seq = 0
+    
+    def add(self, metrics: PerformanceMetrics):
+        """Добавление записи в окно"""
+        value = metrics.processing_time
+        seq = self._next_seq
+        self._next_seq += 1
+        
+        self.entries.append(metrics)
+        self.count += 1
+        self.errors += metrics.error_count > 0
+        self.sum_time += value
+        self.sum_cpu += metrics.cpu_usage
+        self.sum_memory += metrics.memory_usage
+        
+        max_times = self.max_times
+        while max_times and max_times[-1][1] <= value:
+            max_times.pop()
+        max_times.append((seq, value))
+        
+        min_times = self.min_times
+        while min_times and min_times[-1][1] >= value:
+            min_times.pop()
+        min_times.append((seq, value))
+        
+        if self.count > self.capacity:
+            self._pop_oldest()
+    
+    def expire(self, cutoff_time: float):
+        """Вытеснение записей не новее cutoff_time"""
+        entries = self.entries
+        while entries and entries[0].timestamp <= cutoff_time:
+            self._pop_oldest()
+    
+    def _pop_oldest(self):
+        seq = self._next_seq - self.count
+        metrics = self.entries.popleft()
+        self.count -= 1
+        
+        if not self.count:
+            # Пустое окно сбрасывает накопленную погрешность сумм
+            self.errors = 0
+            self.sum_time = self.sum_cpu = self.sum_memory = 0.0
+            self.max_times.clear()
+            self.min_times.clear()
+            return
+        
+        self.errors -= metrics.error_count > 0
+        self.sum_time -= metrics.processing_time
+        self.sum_cpu -= metrics.cpu_usage
+        self.sum_memory -= metrics.memory_usage
+        if self.max_times[0][0] == seq:
+            self.max_times.popleft()
+        if self.min_times[0][0] == seq:
+            self.min_times.popleft()
+
 class PerformanceMonitor:
     """Монитор производительности системы"""
     
+    __slots__ = (
+        'config', 'logger', 'metrics_history', 'system_metrics', '_system_collections', '_windows',
+        '_dirty_buffer', 'flush_batch_size', 'flush_interval', '_last_flush', '_last_compaction',
+        '_writer_queue', '_writer_task', '_io_executor',
+        'request_count', 'error_count', 'average_response_time', '_response_time_m2',
+        '_cached_cpu', '_cached_mem', '_cpu_sampled_at', '_disk_usage', '_disk_sampled_at',
+        'metrics_retention', 'collection_interval', 'is_monitoring', 'monitoring_task', 'is_initialized',
+    )
+    
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.logger = logging.getLogger('core.performance_monitor')
         
-        # Хранилище метрик
-        self.metrics_history: List[PerformanceMetrics] = []
-        self.system_metrics: List[Dict[str, Any]] = []
+        # Хранилище метрик: кольцевые буферы, самые старые записи вытесняются за O(1)
+        self.metrics_history: Deque[PerformanceMetrics] = deque(maxlen=config.get('max_metrics', 100_000))
+        self.system_metrics: Deque[Dict[str, Any]] = deque(maxlen=config.get('max_system_metrics', 5_000))
+        self._system_collections = 0
+        
+        # Агрегаты отчета по каждому временному диапазону, обновляемые при записи запроса
+        self._windows = {
+            time_range: _SlidingWindow(span, self.metrics_history.maxlen)
+            for time_range, span in _REPORT_RANGES.items()
+        }
+        
+        # Метрики, еще не дописанные в журнал
+        self._dirty_buffer: List[PerformanceMetrics] = []
+        self.flush_batch_size = config.get('metrics_flush_batch', 128)
+        self.flush_interval = config.get('metrics_flush_interval', 30)  # секунды
+        self._last_flush = time.monotonic()
+        self._last_compaction = time.monotonic()
+        
+        # Запись на диск выполняет отдельный поток: цикл событий только ставит
+        # операции в очередь, а накопившиеся операции объединяются в одну запись
+        self._writer_queue: asyncio.Queue = asyncio.Queue()
+        self._writer_task: Optional[asyncio.Task] = None
+        self._io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='metrics-writer')
         
         # Статистика
         self.request_count = 0
         self.error_count = 0
         self.average_response_time = 0.0
+        self._response_time_m2 = 0.0  # Сумма квадратов отклонений (алгоритм Уэлфорда)
+        
+        # Последний снимок системных метрик, обновляемый фоновым циклом
+        self._cached_cpu = 0.0
+        self._cached_mem = 0.0
+        self._cpu_sampled_at = 0.0
+        self._disk_usage = None
+        self._disk_sampled_at = 0.0
         
         # Настройки мониторинга
         self.metrics_retention = config.get('metrics_retention_days', 7)
@@ -103,12 +271,16 @@ class PerformanceMonitor:
         """Инициализация монитора производительности"""
         try:
             # Создаем папку для метрик если нужно
-            metrics_path = Path('data/runtime/performance_metrics/')
-            metrics_path.mkdir(parents=True, exist_ok=True)
+            _METRICS_DIR.mkdir(parents=True, exist_ok=True)
             
             # Загружаем исторические данные если есть
             await self._load_historical_metrics()
             
+            # Первый неблокирующий вызов cpu_percent задает точку отсчета;
+            # _cpu_sampled_at не трогаем, чтобы первый сбор сделал реальный замер
+            psutil.cpu_percent(interval=None)
+            self._cached_mem = psutil.virtual_memory().percent
+            
             # Запускаем мониторинг системы
             self.is_monitoring = True
             self.monitoring_task = asyncio.create_task(self._system_monitoring_loop())
@@ -129,48 +301,50 @@ class PerformanceMonitor:
         """
         return self.is_initialized and self.is_monitoring
 
-    async def record_request(self, context):
+    async def record_request(self, context: 'ProcessingContext'):
         """
         Запись метрик обработки запроса
         
         Args:
-            context: Контекст обработки запроса
+            context: Контекст обработки запроса после синтеза ответа
+                (modules_responses, final_response и processing_time заполнены)
         """
         try:
             self.request_count += 1
             
-            # Собираем метрики времени выполнения модулей
-            module_times = {}
-            if hasattr(context, 'modules_responses'):
-                for module_name, response in context.modules_responses.items():
-                    if isinstance(response, dict) and 'processing_time' in response:
-                        module_times[module_name] = response['processing_time']
+            # Собираем метрики времени выполнения модулей (ответ модуля не обязан быть словарем)
+            module_times = {
+                module_name: response['processing_time']
+                for module_name, response in context.modules_responses.items()
+                if isinstance(response, dict) and 'processing_time' in response
+            }
             
-            # Получаем системные метрики
-            memory_usage = psutil.virtual_memory().percent
-            cpu_usage = psutil.cpu_percent(interval=0.1)
+            # Системные метрики берутся из снимка фонового цикла
+            memory_usage = self._cached_mem
+            cpu_usage = self._cached_cpu
             
             # Создаем объект метрик
             metrics = PerformanceMetrics(
                 timestamp=time.time(),
-                request_id=getattr(context, 'request_id', 'unknown'),
-                processing_time=getattr(context, 'processing_time', 0),
+                request_id=context.request_id,
+                processing_time=context.processing_time,
                 module_times=module_times,
                 memory_usage=memory_usage,
                 cpu_usage=cpu_usage,
-                error_count=1 if hasattr(context, 'final_response') and 
-                                isinstance(context.final_response, dict) and 
-                                context.final_response.get('type') == 'error' else 0
+                # ResponseSynthesizer всегда возвращает словарь
+                error_count=1 if context.final_response.get('type') == 'error' else 0
             )
             
             # Добавляем в историю
-            self.metrics_history.append(metrics)
+            self._append_metrics(metrics)
             
             # Обновляем статистику
             await self._update_statistics(metrics)
             
-            # Сохраняем если нужно
-            if len(self.metrics_history) % 10 == 0:  # Сохраняем каждые 10 запросов
+            # Дописываем в журнал пачкой: по размеру буфера или по времени
+            self._dirty_buffer.append(metrics)
+            if (len(self._dirty_buffer) >= self.flush_batch_size
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
                 await self._save_metrics()
             
             self.logger.debug(f"Метрики запроса {metrics.request_id} записаны")
@@ -201,10 +375,11 @@ class PerformanceMonitor:
             Статус здоровья системы
         """
         try:
-            # Системные метрики
+            # Системные метрики: CPU без блокирующего ожидания, диск из кэша
             memory = psutil.virtual_memory()
-            cpu = psutil.cpu_percent(interval=0.1)
-            disk = psutil.disk_usage('/')
+            cpu = self._sample_cpu()
+            disk = self._sample_disk()
+            self._cached_mem = memory.percent
             
             # Метрики приложения
             app_metrics = await self._calculate_application_metrics()
@@ -221,7 +396,7 @@ class PerformanceMonitor:
                     'disk_free_gb': round(disk.free / (1024**3), 2)
                 },
                 'application': app_metrics,
-                'overall_health': await self._calculate_overall_health(cpu, memory.percent, app_metrics)
+                'overall_health': self._calculate_overall_health(cpu, memory.percent, app_metrics)
             }
             
             return health_status
@@ -241,32 +416,26 @@ class PerformanceMonitor:
             Отчет о производительности
         """
         try:
-            # Фильтруем метрики по временному диапазону
-            time_ranges = {
-                '1h': 3600,
-                '24h': 86400,
-                '7d': 604800
-            }
+            # Агрегаты берутся из скользящего окна временного диапазона
+            window = self._windows.get(time_range) or self._windows['1h']
+            cutoff_time = time.time() - window.span
+            window.expire(cutoff_time)
             
-            range_seconds = time_ranges.get(time_range, 3600)
-            cutoff_time = time.time() - range_seconds
-            
-            recent_metrics = [m for m in self.metrics_history if m.timestamp > cutoff_time]
-            
-            if not recent_metrics:
+            total_requests = window.count
+            if not total_requests:
                 return {'error': 'Нет данных за указанный период'}
             
             # Анализируем метрики
             report = {
                 'time_range': time_range,
-                'total_requests': len(recent_metrics),
-                'error_requests': sum(1 for m in recent_metrics if m.error_count > 0),
-                'average_response_time': sum(m.processing_time for m in recent_metrics) / len(recent_metrics),
-                'max_response_time': max(m.processing_time for m in recent_metrics),
-                'min_response_time': min(m.processing_time for m in recent_metrics),
-                'average_cpu_usage': sum(m.cpu_usage for m in recent_metrics) / len(recent_metrics),
-                'average_memory_usage': sum(m.memory_usage for m in recent_metrics) / len(recent_metrics),
-                'module_performance': await self._analyze_module_performance(recent_metrics)
+                'total_requests': total_requests,
+                'error_requests': window.errors,
+                'average_response_time': window.sum_time / total_requests,
+                'max_response_time': window.max_times[0][1],
+                'min_response_time': window.min_times[0][1],
+                'average_cpu_usage': window.sum_cpu / total_requests,
+                'average_memory_usage': window.sum_memory / total_requests,
+                'module_performance': await self._analyze_module_performance(self._recent_metrics(cutoff_time))
             }
             
             # Расчет процента ошибок
@@ -280,107 +449,161 @@ class PerformanceMonitor:
 
     async def _system_monitoring_loop(self):
         """Цикл мониторинга системных метрик"""
-        while self.is_monitoring:
-            try:
-                # Собираем системные метрики
-                system_metrics = await self.get_system_health()
-                self.system_metrics.append(system_metrics)
-                
-                # Сохраняем системные метрики
-                if len(self.system_metrics) % 5 == 0:  # Сохраняем каждые 5 сборов
-                    await self._save_system_metrics()
-                
-                # Очищаем старые данные
-                await self._cleanup_old_metrics()
-                
-                # Ждем до следующего сбора
-                await asyncio.sleep(self.collection_interval)
-                
-            except Exception as e:
-                self.logger.error(f"Ошибка в цикле мониторинга: {e}")
-                await asyncio.sleep(10)  # Ждем перед повторной попыткой
+        # Моменты сбора планируются от абсолютного дедлайна, чтобы время
+        # обработки и неточность sleep не накапливались в сдвиг ряда
+        loop = asyncio.get_running_loop()
+        # Первый замер CPU должен охватывать ненулевой интервал после
+        # точки отсчета из initialize, иначе psutil вернет 0.0
+        await asyncio.sleep(_CPU_SAMPLE_MIN_INTERVAL)
+        timer_fd = self._create_timerfd()
+        next_tick = loop.time()
+        try:
+            while self.is_monitoring:
+                try:
+                    # Собираем системные метрики (заодно обновляется снимок для record_request)
+                    system_metrics = await self.get_system_health()
+                    self.system_metrics.append(system_metrics)
+                    self._system_collections += 1
+                    
+                    # Сохраняем системные метрики
+                    if self._system_collections % 5 == 0:  # Сохраняем каждые 5 сборов
+                        await self._save_system_metrics()
+                    
+                    # Очищаем старые данные
+                    await self._cleanup_old_metrics()
+                    
+                    # Периодически сжимаем журнал метрик запросов
+                    if time.monotonic() - self._last_compaction >= _METRICS_COMPACTION_INTERVAL:
+                        await self._compact_metrics_log()
+                    
+                    # Ждем до следующего сбора
+                    if timer_fd is not None:
+                        await self._wait_timerfd(timer_fd)
+                    else:
+                        next_tick += self.collection_interval
+                        await asyncio.sleep(max(next_tick - loop.time(), 0))
+                    
+                except Exception as e:
+                    self.logger.error(f"Ошибка в цикле мониторинга: {e}")
+                    await asyncio.sleep(10)  # Ждем перед повторной попыткой
+                    next_tick = loop.time()
+        finally:
+            if timer_fd is not None:
+                os.close(timer_fd)
+
+    def _create_timerfd(self) -> Optional[int]:
+        """Периодический timerfd на CLOCK_MONOTONIC (Linux, Python 3.13+), иначе None"""
+        if not hasattr(os, 'timerfd_create'):
+            return None
+        try:
+            fd = os.timerfd_create(time.CLOCK_MONOTONIC, flags=os.TFD_NONBLOCK | os.TFD_CLOEXEC)
+            os.timerfd_settime(fd, initial=self.collection_interval, interval=self.collection_interval)
+            return fd
+        except OSError as e:
+            self.logger.debug(f"timerfd недоступен, используется asyncio.sleep: {e}")
+            return None
+
+    @staticmethod
+    async def _wait_timerfd(fd: int):
+        """Ожидание срабатывания timerfd без блокировки цикла событий"""
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        loop.add_reader(fd, lambda: ready.done() or ready.set_result(None))
+        try:
+            await ready
+        finally:
+            loop.remove_reader(fd)
+        # Сбрасываем счетчик срабатываний; пропущенные тики схлопываются в один
+        os.read(fd, 8)
+
+    def _append_metrics(self, metrics: PerformanceMetrics):
+        """Добавление метрик запроса в историю и в окна отчета"""
+        self.metrics_history.append(metrics)
+        for window in self._windows.values():
+            window.add(metrics)
+
+    def _recent_metrics(self, cutoff_time: float) -> List[PerformanceMetrics]:
+        """Метрики новее cutoff_time (история хронологична, поэтому читается только ее хвост)"""
+        recent = list(takewhile(lambda m: m.timestamp > cutoff_time, reversed(self.metrics_history)))
+        recent.reverse()
+        return recent
+
+    def _sample_cpu(self) -> float:
+        """Неблокирующий опрос загрузки CPU с ограничением частоты"""
+        now = time.monotonic()
+        if now - self._cpu_sampled_at >= _CPU_SAMPLE_MIN_INTERVAL:
+            self._cached_cpu = psutil.cpu_percent(interval=None)
+            self._cpu_sampled_at = now
+        return self._cached_cpu
+
+    def _sample_disk(self):
+        """Использование диска; свободное место меняется медленно, поэтому результат кэшируется"""
+        now = time.monotonic()
+        if self._disk_usage is None or now - self._disk_sampled_at >= _DISK_USAGE_TTL:
+            self._disk_usage = psutil.disk_usage('/')
+            self._disk_sampled_at = now
+        return self._disk_usage
 
     async def _calculate_application_metrics(self) -> Dict[str, Any]:
         """Расчет метрик приложения"""
         if not self.metrics_history:
             return {}
         
-        recent_metrics = self.metrics_history[-100:]  # Последние 100 запросов
+        recent_requests = min(len(self.metrics_history), 100)  # Последние 100 запросов
         
         return {
             'total_requests': self.request_count,
-            'recent_requests': len(recent_metrics),
+            'recent_requests': recent_requests,
             'average_response_time': self.average_response_time,
             'error_count': self.error_count,
             'error_rate': (self.error_count / max(self.request_count, 1)) * 100,
             'active_modules': await self._get_active_modules_count()
         }
 
-    async def _calculate_overall_health(self, cpu: float, memory: float, app_metrics: Dict[str, Any]) -> str:
+    @staticmethod
+    def _calculate_overall_health(cpu: float, memory: float, app_metrics: Dict[str, Any]) -> str:
         """Расчет общего здоровья системы"""
-        health_score = 100
-        
-        # Штрафы за высокую нагрузку
-        if cpu > 80:
-            health_score -= 20
-        elif cpu > 90:
-            health_score -= 40
-            
-        if memory > 80:
-            health_score -= 20
-        elif memory > 90:
-            health_score -= 40
-            
-        if app_metrics and app_metrics.get('error_rate', 0) > 5:
-            health_score -= 20
-        elif app_metrics.get('error_rate', 0) > 10:
-            health_score -= 40
-        
-        # Определяем статус
-        if health_score >= 80:
-            return 'healthy'
-        elif health_score >= 60:
-            return 'degraded'
-        elif health_score >= 40:
-            return 'unhealthy'
-        else:
-            return 'critical'
+        # Каждый порог (CPU > 80%, память > 80%, ошибок > 5%) снимает 20 баллов из 100;
+        # статус зависит только от числа сработавших порогов
+        penalties = (cpu > 80) + (memory > 80) + (bool(app_metrics) and app_metrics.get('error_rate', 0) > 5)
+        return _HEALTH_STATUS_BY_PENALTIES[penalties]
 
     async def _analyze_module_performance(self, metrics: List[PerformanceMetrics]) -> Dict[str, Any]:
         """Анализ производительности модулей"""
-        module_stats = {}
+        # Сумма, количество, максимум и минимум считаются за один проход без хранения всех замеров
+        module_stats: Dict[str, list] = {}
         
         for metric in metrics:
             for module_name, module_time in metric.module_times.items():
-                if module_name not in module_stats:
-                    module_stats[module_name] = {
-                        'total_time': 0,
-                        'count': 0,
-                        'times': []
-                    }
+                stats = module_stats.get(module_name)
+                if stats is None:
+                    module_stats[module_name] = [module_time, 1, module_time, module_time]
+                    continue
                 
-                module_stats[module_name]['total_time'] += module_time
-                module_stats[module_name]['count'] += 1
-                module_stats[module_name]['times'].append(module_time)
+                stats[0] += module_time
+                stats[1] += 1
+                if module_time > stats[2]:
+                    stats[2] = module_time
+                elif module_time < stats[3]:
+                    stats[3] = module_time
         
         # Расчет статистики
-        result = {}
-        for module_name, stats in module_stats.items():
-            if stats['count'] > 0:
-                result[module_name] = {
-                    'average_time': stats['total_time'] / stats['count'],
-                    'max_time': max(stats['times']),
-                    'min_time': min(stats['times']),
-                    'request_count': stats['count']
-                }
-        
-        return result
+        return {
+            module_name: {
+                'average_time': total_time / count,
+                'max_time': max_time,
+                'min_time': min_time,
+                'request_count': count
+            }
+            for module_name, (total_time, count, max_time, min_time) in module_stats.items()
+        }
 
     async def _update_statistics(self, metrics: PerformanceMetrics):
         """Обновление общей статистики"""
-        # Обновляем среднее время ответа
-        total_time = self.average_response_time * (self.request_count - 1) + metrics.processing_time
-        self.average_response_time = total_time / self.request_count
+        # Обновляем среднее время ответа и дисперсию онлайн (алгоритм Уэлфорда)
+        delta = metrics.processing_time - self.average_response_time
+        self.average_response_time += delta / self.request_count
+        self._response_time_m2 += delta * (metrics.processing_time - self.average_response_time)
         
         # Обновляем счетчик ошибок
         if metrics.error_count > 0:
@@ -389,53 +612,150 @@ class PerformanceMonitor:
     async def _get_active_modules_count(self) -> int:
         """Получение количества активных модулей"""
         # В реальной системе здесь будет обращение к ModuleManager
-        return len([m for m in self.metrics_history[-10:] if m.module_times]) if self.metrics_history else 0
+        return sum(1 for m in islice(reversed(self.metrics_history), 10) if m.module_times)
+
+    @staticmethod
+    def _tail(buffer: deque, count: int):
+        """Итератор по последним count элементам буфера"""
+        return islice(buffer, max(len(buffer) - count, 0), None)
+
+    @staticmethod
+    def _metrics_to_dict(m: PerformanceMetrics) -> Dict[str, Any]:
+        """Представление метрик запроса для сохранения"""
+        return {
+            'timestamp': m.timestamp,
+            'request_id': m.request_id,
+            'processing_time': m.processing_time,
+            'module_times': m.module_times,
+            'memory_usage': m.memory_usage,
+            'cpu_usage': m.cpu_usage,
+            'error_count': m.error_count
+        }
+
+    @classmethod
+    def _encode_metrics_lines(cls, metrics) -> bytes:
+        """Сериализация метрик в строки JSON Lines"""
+        return b''.join(_json_dumps(cls._metrics_to_dict(m)) + b'\n' for m in metrics)
+
+    def _enqueue_write(self, path: Path, data: bytes, append: bool):
+        """Постановка записи в очередь фонового писателя"""
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(self._writer_loop())
+        self._writer_queue.put_nowait((path, data, append))
+
+    async def _writer_loop(self):
+        """Фоновый писатель: объединяет накопившиеся операции и выполняет их в потоке"""
+        loop = asyncio.get_running_loop()
+        queue = self._writer_queue
+        stopping = False
+        while not stopping:
+            batch = [await queue.get()]
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            
+            # None - сигнал остановки после записи уже поставленных операций
+            stopping = None in batch
+            operations = self._coalesce_writes([item for item in batch if item is not None])
+            
+            try:
+                await loop.run_in_executor(self._io_executor, self._write_operations, operations)
+            except Exception as e:
+                self.logger.error(f"Ошибка записи метрик на диск: {e}")
+
+    @staticmethod
+    def _coalesce_writes(batch: List[tuple]) -> Dict[Path, List[list]]:
+        """
+        Объединение операций записи по файлам
+        
+        Подряд идущие дописывания склеиваются; полная перезапись файла
+        отменяет все поставленные до нее операции с этим файлом
+        """
+        operations: Dict[Path, List[list]] = {}
+        for path, data, append in batch:
+            file_ops = operations.setdefault(path, [])
+            if not append:
+                file_ops.clear()
+                file_ops.append([data, False])
+            elif file_ops and file_ops[-1][1]:
+                file_ops[-1][0] += data
+            else:
+                file_ops.append([data, True])
+        return operations
+
+    @staticmethod
+    def _write_operations(operations: Dict[Path, List[list]]):
+        """Выполнение операций записи с одним fsync на операцию (в потоке писателя)"""
+        for path, file_ops in operations.items():
+            for data, append in file_ops:
+                # Перезапись идет через временный файл, чтобы файл не оказался обрезанным
+                target = path if append else path.with_name(path.name + '.tmp')
+                with open(target, 'ab' if append else 'wb') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                if not append:
+                    os.replace(target, path)
 
     async def _save_metrics(self):
-        """Сохранение метрик в файл"""
+        """Дописывание накопленных метрик в журнал"""
+        if not self._dirty_buffer:
+            return
+        
+        batch = self._dirty_buffer
+        self._dirty_buffer = []
+        self._last_flush = time.monotonic()
+        
         try:
-            metrics_path = Path('data/runtime/performance_metrics/request_metrics.json')
-            
-            # Сохраняем только последние метрики
-            data_to_save = [
-                {
-                    'timestamp': m.timestamp,
-                    'request_id': m.request_id,
-                    'processing_time': m.processing_time,
-                    'module_times': m.module_times,
-                    'memory_usage': m.memory_usage,
-                    'cpu_usage': m.cpu_usage,
-                    'error_count': m.error_count
-                }
-                for m in self.metrics_history[-1000:]  # Сохраняем последние 1000 записей
-            ]
-            
-            with open(metrics_path, 'w', encoding='utf-8') as f:
-                json.dump(data_to_save, f, indent=2, ensure_ascii=False)
-                
+            self._enqueue_write(_REQUEST_METRICS_LOG, self._encode_metrics_lines(batch), append=True)
         except Exception as e:
             self.logger.error(f"Ошибка сохранения метрик: {e}")
 
+    async def _compact_metrics_log(self):
+        """Сжатие журнала до последних 1000 записей"""
+        self._last_compaction = time.monotonic()
+        try:
+            # Все метрики уже в памяти, поэтому буфер просто сбрасывается
+            self._dirty_buffer = []
+            data = self._encode_metrics_lines(self._tail(self.metrics_history, 1000))
+            self._enqueue_write(_REQUEST_METRICS_LOG, data, append=False)
+        except Exception as e:
+            self.logger.error(f"Ошибка сжатия журнала метрик: {e}")
+
     async def _save_system_metrics(self):
         """Сохранение системных метрик"""
         try:
-            metrics_path = Path('data/runtime/performance_metrics/system_metrics.json')
-            
-            with open(metrics_path, 'w', encoding='utf-8') as f:
-                json.dump(self.system_metrics[-500:], f, indent=2, ensure_ascii=False)  # Последние 500 записей
-                
+            data = _json_dumps(list(self._tail(self.system_metrics, 500)), indent=True)  # Последние 500 записей
+            self._enqueue_write(_METRICS_DIR / 'system_metrics.json', data, append=False)
         except Exception as e:
             self.logger.error(f"Ошибка сохранения системных метрик: {e}")
 
+    def _read_historical_data(self) -> Optional[List[Dict[str, Any]]]:
+        """Чтение сохраненных метрик запросов (выполняется вне цикла событий)"""
+        if _REQUEST_METRICS_LOG.exists():
+            historical_data = []
+            with open(_REQUEST_METRICS_LOG, 'rb') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        historical_data.append(_json_loads(line))
+                    except ValueError as e:
+                        # Последняя строка могла оборваться при аварийном завершении
+                        self.logger.warning(f"Пропуск поврежденной строки журнала метрик: {e}")
+            return historical_data
+        
+        if _LEGACY_REQUEST_METRICS.exists():
+            with open(_LEGACY_REQUEST_METRICS, 'rb') as f:
+                return _json_loads(f.read())
+        
+        return None
+
     async def _load_historical_metrics(self):
         """Загрузка исторических метрик"""
         try:
-            metrics_path = Path('data/runtime/performance_metrics/request_metrics.json')
+            historical_data = await asyncio.to_thread(self._read_historical_data)
             
-            if metrics_path.exists():
-                with open(metrics_path, 'r', encoding='utf-8') as f:
-                    historical_data = json.load(f)
-                
+            if historical_data is not None:
                 # Восстанавливаем объекты метрик с преобразованием типов
                 for data in historical_data:
                     try:
@@ -448,7 +768,7 @@ class PerformanceMonitor:
                             cpu_usage=float(data['cpu_usage']),
                             error_count=int(data['error_count'])
                         )
-                        self.metrics_history.append(metrics)
+                        self._append_metrics(metrics)
                     except (KeyError, ValueError, TypeError) as e:
                         self.logger.warning(f"Пропуск некорректной метрики: {e}")
                 
@@ -468,24 +788,23 @@ class PerformanceMonitor:
                 """Проверяет, является ли метрика не устаревшей"""
                 try:
                     # Гарантируем, что оба значения - числа
-                    metric_time = float(metric_timestamp)
-                    cutoff = float(cutoff_time)
-                    return metric_time > cutoff
+                    return float(metric_timestamp) > cutoff_time
                 except (TypeError, ValueError) as e:
                     self.logger.warning(f"Некорректная временная метка: {metric_timestamp}, ошибка: {e}")
                     return False
             
-            # Очищаем историю запросов
-            self.metrics_history = [
-                m for m in self.metrics_history 
-                if is_metric_recent(getattr(m, 'timestamp', 0))
-            ]
+            # Записи добавляются в хронологическом порядке, поэтому
+            # устаревшие снимаются с начала буфера без его перестройки
+            history = self.metrics_history
+            while history and not is_metric_recent(history[0].timestamp):
+                history.popleft()
+            
+            for window in self._windows.values():
+                window.expire(cutoff_time)
             
-            # Очищаем системные метрики
-            self.system_metrics = [
-                m for m in self.system_metrics 
-                if is_metric_recent(m.get('timestamp_seconds', 0))
-            ]
+            system_metrics = self.system_metrics
+            while system_metrics and not is_metric_recent(system_metrics[0].get('timestamp_seconds', 0)):
+                system_metrics.popleft()
             
             self.logger.debug(f"Очистка метрик завершена. Осталось: {len(self.metrics_history)} запросов, {len(self.system_metrics)} системных метрик")
             
@@ -499,6 +818,7 @@ class PerformanceMonitor:
             'request_count': self.request_count,
             'error_count': self.error_count,
             'average_response_time': self.average_response_time,
+            'response_time_stddev': (self._response_time_m2 / self.request_count) ** 0.5 if self.request_count else 0.0,
             'metrics_history_size': len(self.metrics_history),
             'system_metrics_size': len(self.system_metrics),
             'is_initialized': self.is_initialized
@@ -515,8 +835,12 @@ class PerformanceMonitor:
             except asyncio.CancelledError:
                 pass
         
-        # Сохраняем все метрики перед завершением
-        await self._save_metrics()
+        # Сохраняем все метрики перед завершением и дожидаемся записи
+        await self._compact_metrics_log()
         await self._save_system_metrics()
+        self._writer_queue.put_nowait(None)
+        await self._writer_task
+        self._writer_task = None
+        self._io_executor.shutdown(wait=True)
         
         self.logger.info("Монитор производительности завершил работу")
\ No newline at end of file
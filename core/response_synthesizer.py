@@ -3,20 +3,44 @@
 Объединяет результаты от модулей в единый согласованный ответ
 """
 
+import functools
 import logging
-from typing import Dict, Any, List, Optional
+import random
+import re
+import time
+from typing import Dict, Any, List, Optional, Tuple
 import json
 from datetime import datetime
 
+# Плейсхолдер шаблона ответа: {имя}
+_PLACEHOLDER_RE = re.compile(r'\{([^{}]+)\}')
+
+# Модули, чей ответ делает ответ мультимодальным или содержит действия
+_VISUAL_MODULES = frozenset({'visual_processor'})
+_ACTION_MODULES = frozenset({'action_executor'})
+
+# Собственный генератор для выбора среди вариантов шаблона
+_template_rng = random.Random()
+
+@functools.lru_cache(maxsize=1)
+def _iso_timestamp(second: int) -> str:
+    """ISO-строка времени с точностью до секунды; в пределах секунды переиспользуется"""
+    return datetime.fromtimestamp(second).isoformat()
+
 class ResponseSynthesizer:
     """Синтезатор финального ответа системы"""
     
+    __slots__ = (
+        'config', 'logger', 'response_templates', '_compiled_templates', 'response_style', 'is_initialized',
+    )
+    
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.logger = logging.getLogger('core.response_synthesizer')
         
-        # Шаблоны ответов
+        # Шаблоны ответов и их разобранное представление
         self.response_templates = {}
+        self._compiled_templates: Dict[str, Tuple[Tuple[Tuple[str, Optional[str]], ...], ...]] = {}
         
         # Стиль ответа
         self.response_style = config.get('style', 'neutral')
@@ -58,7 +82,7 @@ class ResponseSynthesizer:
             
             # Создаем базовую структуру ответа
             base_response = {
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': _iso_timestamp(int(time.time())),
                 'request_id': context.request_id,
                 'type': response_type,
                 'intent': context.intent
@@ -94,33 +118,28 @@ class ResponseSynthesizer:
 
     async def _determine_response_type(self, context) -> str:
         """Определение типа ответа на основе намерения и данных модулей"""
-        intent = context.intent
+        module_names = context.modules_responses.keys()
         
         # Проверяем есть ли визуальные данные
-        has_visual = any('image' in str(key).lower() or 'visual' in str(key).lower() 
-                        for key in context.modules_responses.keys())
+        if not _VISUAL_MODULES.isdisjoint(module_names):
+            return 'multimodal'
         
         # Проверяем есть ли действия
-        has_actions = any('action' in str(key).lower() or 'executor' in str(key).lower()
-                         for key in context.modules_responses.keys())
-        
-        if has_visual:
-            return 'multimodal'
-        elif has_actions:
+        if not _ACTION_MODULES.isdisjoint(module_names):
             return 'action'
-        elif intent in ['creative', 'story']:
-            return 'text'  # Для креативных ответов - расширенный текст
-        else:
-            return 'text'
+        
+        # В том числе для креативных намерений ('creative', 'story') - расширенный текст
+        return 'text'
 
     async def _generate_text_response(self, context, module_data: Dict[str, Any]) -> str:
         """Генерация текстового ответа"""
         intent = context.intent
         
         # Используем шаблоны для стандартных намерений
-        if intent in self.response_templates:
-            template = self.response_templates[intent]
-            return await self._fill_template(template, context, module_data)
+        variants = self._compiled_templates.get(intent)
+        if variants:
+            template_parts = variants[0] if len(variants) == 1 else _template_rng.choice(variants)
+            return await self._fill_template(template_parts, context, module_data)
         
         # Для неизвестных намерений пытаемся извлечь текст из модулей
         for module_name, data in module_data.items():
@@ -188,32 +207,50 @@ class ResponseSynthesizer:
         
         return combined_data
 
-    async def _fill_template(self, template: str, context, module_data: Dict[str, Any]) -> str:
-        """Заполнение шаблона ответа данными"""
+    @staticmethod
+    def _compile_template(template: str) -> Tuple[Tuple[str, Optional[str]], ...]:
+        """Разбор шаблона на пары (текст, имя плейсхолдера); у последней пары имени нет"""
+        parts = []
+        position = 0
+        for match in _PLACEHOLDER_RE.finditer(template):
+            parts.append((template[position:match.start()], match.group(1)))
+            position = match.end()
+        parts.append((template[position:], None))
+        return tuple(parts)
+
+    def _compile_templates(self):
+        """Разбор всех шаблонов ответов; список задает равновероятные варианты"""
+        self._compiled_templates = {
+            intent: tuple(
+                self._compile_template(variant)
+                for variant in ([template] if isinstance(template, str) else template)
+            )
+            for intent, template in self.response_templates.items()
+        }
+
+    async def _fill_template(self, template_parts: Tuple[Tuple[str, Optional[str]], ...],
+                             context, module_data: Dict[str, Any]) -> str:
+        """Заполнение разобранного шаблона ответа данными"""
         try:
-            # Простая замена плейсхолдеров
-            filled_template = template
-            
-            # Замена сущностей
+            # Строковые данные модулей; сущности имеют приоритет над ними
+            substitutions = {key: value for key, value in module_data.items() if isinstance(value, str)}
             if context.entities:
                 for entity_type, entities in context.entities.items():
                     if entities:
-                        placeholder = f'{{{entity_type}}}'
-                        if placeholder in filled_template:
-                            filled_template = filled_template.replace(placeholder, entities[0])
-            
-            # Замена данных модулей
-            for key, value in module_data.items():
-                if isinstance(value, str):
-                    placeholder = f'{{{key}}}'
-                    if placeholder in filled_template:
-                        filled_template = filled_template.replace(placeholder, value)
+                        substitutions[entity_type] = entities[0]
             
-            return filled_template
+            # Неизвестные плейсхолдеры остаются как есть
+            chunks = []
+            for literal, key in template_parts:
+                chunks.append(literal)
+                if key is not None:
+                    chunks.append(substitutions.get(key, f'{{{key}}}'))
+            return ''.join(chunks)
             
         except Exception as e:
             self.logger.error(f"Ошибка заполнения шаблона: {e}")
-            return template  # Возвращаем оригинальный шаблон при ошибке
+            # Возвращаем исходный шаблон при ошибке
+            return ''.join(literal if key is None else f'{literal}{{{key}}}' for literal, key in template_parts)
 
     async def _prepare_context_data(self, context) -> Dict[str, Any]:
         """Подготовка контекстных данных для ответа"""
@@ -244,12 +281,14 @@ class ResponseSynthesizer:
             ],
             'unknown': "Извините, я не совсем понял ваш вопрос. Можете переформулировать?"
         }
+        self._compile_templates()
         
         self.logger.debug("Шаблоны ответов загружены")
 
     async def update_templates(self, new_templates: Dict[str, Any]):
         """Обновление шаблонов ответов"""
         self.response_templates.update(new_templates)
+        self._compile_templates()
         self.logger.info("Шаблоны ответов обновлены")
 
     async def set_response_style(self, style: str):
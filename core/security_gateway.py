@@ -3,22 +3,88 @@
 Обеспечивает безопасность системы на всех уровнях
 """
 
+import asyncio
 import logging
 import re
-from typing import Dict, Any, List, Optional, Union
+from collections import OrderedDict, deque
+from itertools import islice
+from typing import Deque, Dict, Any, List, Optional, Sequence, Tuple, Union
 from dataclasses import dataclass
-import hashlib
 import time
 import json
 
-@dataclass
+try:
+    import re2
+    HAS_RE2 = True
+except ImportError:
+    HAS_RE2 = False
+
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
+# Встроенный флаг нечувствительности к регистру: в объединенном выражении
+# глобальные флаги допустимы только в начале, поэтому он снимается с паттернов
+_INLINE_IGNORECASE = '(?i)'
+
+# Пробельные символы Unicode, которые совпадают с \s модуля re; в RE2 \s
+# покрывает только ASCII, поэтому для него \s заменяется этим набором
+_RE2_UNICODE_SPACE = (
+    r'\t-\r\x{1c}-\x{20}\x{85}\x{a0}\x{1680}\x{2000}-\x{200a}'
+    r'\x{2028}\x{2029}\x{202f}\x{205f}\x{3000}'
+)
+
+# Классы, которые в RE2 работают только по ASCII и не имеют простой замены
+_RE2_ASCII_ONLY_ESCAPES = frozenset('wWdDbB')
+
+# Максимальная длина текстового ввода (символы)
+MAX_TEXT_LEN = 10000
+
+# Допустимые типы ввода
+_VALID_INPUT_TYPES = frozenset({'text', 'audio', 'image'})
+
+# Неизменяемые по смыслу результаты проверки содержимого создаются один раз
+_TEXT_SAFE_RESULT = {'allowed': True, 'reason': "Текст безопасен", 'risk_level': 'low'}
+_TEXT_TOO_LONG_RESULT = {'allowed': False, 'reason': "Текст слишком длинный", 'risk_level': 'medium'}
+_AUDIO_SAFE_RESULT = {'allowed': True, 'reason': "Аудио данные безопасны", 'risk_level': 'low'}
+_IMAGE_SAFE_RESULT = {'allowed': True, 'reason': "Изображение безопасно", 'risk_level': 'low'}
+
+@dataclass(slots=True, frozen=True)
 class SecurityCheckResult:
     """Результат проверки безопасности"""
     allowed: bool
     reason: str
     risk_level: str  # 'low', 'medium', 'high'
-    checks_passed: List[str]
-    checks_failed: List[str]
+    checks_passed: Sequence[str]
+    checks_failed: Sequence[str]
+
+# Проверки запроса в порядке выполнения
+_CHECK_ORDER = ('rate_limit', 'content_safety', 'request_structure', 'advanced_checks')
+
+# Результаты успешной проверки неизменяемы и создаются один раз
+_PASSED_RESULT = SecurityCheckResult(
+    allowed=True,
+    reason="Все проверки пройдены",
+    risk_level='low',
+    checks_passed=_CHECK_ORDER[:3],
+    checks_failed=()
+)
+_PASSED_ADVANCED_RESULT = SecurityCheckResult(
+    allowed=True,
+    reason="Все проверки пройдены",
+    risk_level='low',
+    checks_passed=_CHECK_ORDER,
+    checks_failed=()
+)
+
+@dataclass(slots=True)
+class _SimpleContext:
+    """Минимальный контекст запроса для validate_input"""
+    user_input: Any
+    input_type: str = 'text'
+    request_id: str = ''
 
 class SecurityError(Exception):
     """Исключение безопасности"""
@@ -31,19 +97,41 @@ class SecurityGateway:
         self.config = config
         self.logger = logging.getLogger('core.security_gateway')
         
-        # Паттерны для проверки безопасности
+        # Паттерны для проверки безопасности; вредоносные паттерны объединены
+        # в одно выражение с именованной группой p<i> на каждый паттерн
         self.malicious_patterns = []
+        self._malicious_union = None
         self.suspicious_keywords = []
+        # Ключевые слова в нижнем регистре и автомат Ахо-Корасик по ним (при наличии pyahocorasick)
+        self._keywords_lower: Tuple[str, ...] = ()
+        self._keyword_automaton = None
+        
+        # Ограничения частоты запросов: корзина токенов клиента (токены, время пополнения).
+        # Порядок записей - по времени последнего запроса; число клиентов ограничено
+        self.rate_limits: 'OrderedDict[str, Tuple[float, float]]' = OrderedDict()
+        self.max_tracked_clients = config.get('rate_limit_max_clients', 100000)
         
-        # Ограничения частоты запросов
-        self.rate_limits: Dict[str, List[float]] = {}
+        # История подозрительных действий (хранятся последние 1000 событий)
+        self.suspicious_activities: Deque[Dict[str, Any]] = deque(maxlen=1000)
         
-        # История подозрительных действий
-        self.suspicious_activities: List[Dict[str, Any]] = []
+        # Запись событий в журнал выполняет фоновая задача: проверка запроса
+        # только ставит событие в очередь, накопившиеся события пишутся одной записью.
+        # Задача работает до shutdown(), который нужно вызвать, чтобы дописать очередь
+        self._log_queue: asyncio.Queue = asyncio.Queue()
+        self._log_task: Optional[asyncio.Task] = None
         
         # Уровень безопасности
         self.security_level = config.get('security_level', 'medium')
         
+        # Проверки содержимого по типу ввода
+        self._content_checks = {
+            'text': self._check_text_safety,
+            # Для аудио проверяем длину и метаданные
+            'audio': self._check_audio_safety,
+            # Для изображений проверяем размер и формат
+            'image': self._check_image_safety,
+        }
+        
         self.is_initialized = False
 
     async def validate_input(self, data):
@@ -57,13 +145,7 @@ class SecurityGateway:
             Словарь с результатом проверки безопасности
         """
         # Создаем минимальный контекст для проверки
-        class SimpleContext:
-            def __init__(self, data):
-                self.user_input = data
-                self.input_type = 'text'
-                self.request_id = f"validate_input_{int(time.time())}"
-    
-        context = SimpleContext(data)
+        context = _SimpleContext(data, request_id=f"validate_input_{time.monotonic_ns()}")
         result = await self.validate_request(context)
     
         # Возвращаем словарь с ожидаемыми полями
@@ -102,8 +184,8 @@ class SecurityGateway:
         if not self.is_initialized:
             raise RuntimeError("Шлюз безопасности не инициализирован")
         
-        checks_passed = []
-        checks_failed = []
+        # Номер текущей проверки в _CHECK_ORDER: все предыдущие пройдены
+        stage = 0
         
         try:
             user_input = context.user_input
@@ -112,142 +194,129 @@ class SecurityGateway:
             self.logger.debug(f"Проверка безопасности запроса {request_id}")
             
             # 1. Проверка частоты запросов
-            if not await self._check_rate_limit(request_id):
-                checks_failed.append('rate_limit')
-                return SecurityCheckResult(
-                    allowed=False,
-                    reason="Превышена частота запросов",
-                    risk_level='high',
-                    checks_passed=checks_passed,
-                    checks_failed=checks_failed
-                )
-            checks_passed.append('rate_limit')
+            if not self._check_rate_limit(request_id):
+                return self._rejected_result(stage, "Превышена частота запросов", 'high')
+            stage = 1
             
             # 2. Проверка содержимого ввода
-            content_check = await self._check_content_safety(user_input, context.input_type)
+            content_check = self._check_content_safety(user_input, context.input_type)
             if not content_check['allowed']:
-                checks_failed.append('content_safety')
-                return SecurityCheckResult(
-                    allowed=False,
-                    reason=content_check['reason'],
-                    risk_level=content_check['risk_level'],
-                    checks_passed=checks_passed,
-                    checks_failed=checks_failed
-                )
-            checks_passed.append('content_safety')
+                return self._rejected_result(stage, content_check['reason'], content_check['risk_level'])
+            stage = 2
             
             # 3. Проверка структуры запроса
-            if not await self._check_request_structure(context):
-                checks_failed.append('request_structure')
-                return SecurityCheckResult(
-                    allowed=False,
-                    reason="Некорректная структура запроса",
-                    risk_level='medium',
-                    checks_passed=checks_passed,
-                    checks_failed=checks_failed
-                )
-            checks_passed.append('request_structure')
+            if not self._check_request_structure(context):
+                return self._rejected_result(stage, "Некорректная структура запроса", 'medium')
+            stage = 3
             
             # 4. Дополнительные проверки для высокого уровня безопасности
+            result = _PASSED_RESULT
             if self.security_level == 'high':
                 advanced_check = await self._advanced_security_checks(context)
                 if not advanced_check['allowed']:
-                    checks_failed.append('advanced_checks')
-                    return SecurityCheckResult(
-                        allowed=False,
-                        reason=advanced_check['reason'],
-                        risk_level=advanced_check['risk_level'],
-                        checks_passed=checks_passed,
-                        checks_failed=checks_failed
-                    )
-                checks_passed.append('advanced_checks')
+                    return self._rejected_result(stage, advanced_check['reason'], advanced_check['risk_level'])
+                result = _PASSED_ADVANCED_RESULT
             
             self.logger.info(f"Запрос {request_id} прошел проверки безопасности")
             
-            return SecurityCheckResult(
-                allowed=True,
-                reason="Все проверки пройдены",
-                risk_level='low',
-                checks_passed=checks_passed,
-                checks_failed=checks_failed
-            )
+            return result
             
         except Exception as e:
             self.logger.error(f"Ошибка проверки безопасности: {e}")
-            checks_failed.append('system_error')
             return SecurityCheckResult(
                 allowed=False,
                 reason=f"Системная ошибка при проверке: {e}",
                 risk_level='high',
-                checks_passed=checks_passed,
-                checks_failed=checks_failed
+                checks_passed=_CHECK_ORDER[:stage],
+                checks_failed=('system_error',)
             )
 
-    async def _check_rate_limit(self, request_id: str, window_seconds: int = 60, max_requests: int = 100) -> bool:
+    @staticmethod
+    def _rejected_result(stage: int, reason: str, risk_level: str) -> SecurityCheckResult:
+        """Результат отказа на проверке с номером stage"""
+        return SecurityCheckResult(
+            allowed=False,
+            reason=reason,
+            risk_level=risk_level,
+            checks_passed=_CHECK_ORDER[:stage],
+            checks_failed=(_CHECK_ORDER[stage],)
+        )
+
+    def _check_rate_limit(self, request_id: str, window_seconds: int = 60, max_requests: int = 100) -> bool:
         """Проверка ограничения частоты запросов"""
-        current_time = time.time()
+        current_time = time.monotonic()
         client_id = self._extract_client_id(request_id)
         
-        # Инициализация счетчика для клиента
-        if client_id not in self.rate_limits:
-            self.rate_limits[client_id] = []
-        
-        # Удаляем старые запросы вне окна
-        window_start = current_time - window_seconds
-        self.rate_limits[client_id] = [t for t in self.rate_limits[client_id] if t > window_start]
+        # Корзина нового клиента заполнена полностью; токены пополняются
+        # равномерно со скоростью max_requests за window_seconds
+        tokens, last_refill = self.rate_limits.get(client_id, (max_requests, current_time))
+        tokens = min(max_requests, tokens + (current_time - last_refill) * (max_requests / window_seconds))
         
         # Проверяем лимит
-        if len(self.rate_limits[client_id]) >= max_requests:
+        if tokens < 1.0:
             self.logger.warning(f"Превышен лимит запросов для клиента {client_id}")
-            await self._log_suspicious_activity('rate_limit_exceeded', {
+            self._log_suspicious_activity('rate_limit_exceeded', {
                 'client_id': client_id,
-                'request_count': len(self.rate_limits[client_id])
+                'tokens_left': round(tokens, 3)
             })
             return False
         
-        # Добавляем текущий запрос
-        self.rate_limits[client_id].append(current_time)
+        # Списываем токен за текущий запрос
+        self.rate_limits[client_id] = (tokens - 1.0, current_time)
+        self.rate_limits.move_to_end(client_id)
+        self._evict_idle_clients(current_time - window_seconds)
         return True
 
-    async def _check_content_safety(self, user_input: Any, input_type: str) -> Dict[str, Any]:
+    def _evict_idle_clients(self, idle_before: float):
+        """
+        Удаление записей неактивных клиентов из начала rate_limits
+        
+        Корзина клиента без запросов дольше окна уже полностью пополнена,
+        поэтому удаление такой записи не меняет результат проверки. При
+        превышении max_tracked_clients удаляются самые давние клиенты.
+        """
+        rate_limits = self.rate_limits
+        while rate_limits:
+            _, last_refill = next(iter(rate_limits.values()))
+            if last_refill > idle_before and len(rate_limits) <= self.max_tracked_clients:
+                break
+            rate_limits.popitem(last=False)
+
+    def _check_content_safety(self, user_input: Any, input_type: str) -> Dict[str, Any]:
         """Проверка безопасности содержимого"""
-        if input_type == 'text':
-            return await self._check_text_safety(str(user_input))
-        elif input_type == 'audio':
-            # Для аудио проверяем длину и метаданные
-            return await self._check_audio_safety(user_input)
-        elif input_type == 'image':
-            # Для изображений проверяем размер и формат
-            return await self._check_image_safety(user_input)
-        else:
+        check = self._content_checks.get(input_type)
+        if check is None:
             return {'allowed': False, 'reason': f'Неизвестный тип ввода: {input_type}', 'risk_level': 'medium'}
+        return check(user_input)
 
-    async def _check_text_safety(self, text: str) -> Dict[str, Any]:
+    def _check_text_safety(self, text: Any) -> Dict[str, Any]:
         """Проверка безопасности текста"""
-        text_lower = text.lower()
+        text = str(text)
         
-        # Проверка на вредоносные паттерны
-        for pattern in self.malicious_patterns:
-            if re.search(pattern, text_lower, re.IGNORECASE):
-                await self._log_suspicious_activity('malicious_pattern_detected', {
-                    'pattern': pattern,
-                    'text_sample': text[:100]
-                })
-                return {
-                    'allowed': False,
-                    'reason': f"Обнаружен запрещенный паттерн: {pattern}",
-                    'risk_level': 'high'
-                }
+        # Длина проверяется до сканирования: слишком длинный ввод не доходит до паттернов
+        if len(text) > MAX_TEXT_LEN:
+            return _TEXT_TOO_LONG_RESULT
         
-        # Проверка подозрительных ключевых слов
-        suspicious_found = []
-        for keyword in self.suspicious_keywords:
-            if keyword in text_lower:
-                suspicious_found.append(keyword)
+        # Проверка на вредоносные паттерны: один проход по тексту для всех паттернов
+        # (регистр учитывается флагом IGNORECASE)
+        match = self._malicious_union.search(text) if self._malicious_union is not None else None
+        if match:
+            pattern = self.malicious_patterns[int(match.lastgroup[1:])]
+            self._log_suspicious_activity('malicious_pattern_detected', {
+                'pattern': pattern,
+                'text_sample': text[:100]
+            })
+            return {
+                'allowed': False,
+                'reason': f"Обнаружен запрещенный паттерн: {pattern}",
+                'risk_level': 'high'
+            }
         
+        # Проверка подозрительных ключевых слов
+        suspicious_found = self._find_suspicious_keywords(text)
         if suspicious_found:
             risk_level = 'medium' if len(suspicious_found) < 3 else 'high'
-            await self._log_suspicious_activity('suspicious_keywords_detected', {
+            self._log_suspicious_activity('suspicious_keywords_detected', {
                 'keywords': suspicious_found,
                 'text_sample': text[:100]
             })
@@ -259,17 +328,29 @@ class SecurityGateway:
                     'risk_level': 'high'
                 }
         
-        # Проверка длины текста
-        if len(text) > 10000:  # Максимальная длина текста
-            return {
-                'allowed': False,
-                'reason': "Текст слишком длинный",
-                'risk_level': 'medium'
-            }
+        return _TEXT_SAFE_RESULT
+
+    def _find_suspicious_keywords(self, text: str) -> List[str]:
+        """
+        Поиск подозрительных ключевых слов в тексте
         
-        return {'allowed': True, 'reason': "Текст безопасен", 'risk_level': 'low'}
+        Автомат находит все слова за один проход; найденные возвращаются
+        в порядке списка ключевых слов. Копия текста в нижнем регистре нужна
+        только здесь и создается, лишь если есть что искать.
+        """
+        if not self.suspicious_keywords:
+            return []
+        
+        text_lower = text.lower()
+        if self._keyword_automaton is not None:
+            found_indexes = {index for _, index in self._keyword_automaton.iter(text_lower)}
+            return [self.suspicious_keywords[index] for index in sorted(found_indexes)]
+        return [
+            keyword for keyword, keyword_lower in zip(self.suspicious_keywords, self._keywords_lower)
+            if keyword_lower in text_lower
+        ]
 
-    async def _check_audio_safety(self, audio_data: Any) -> Dict[str, Any]:
+    def _check_audio_safety(self, audio_data: Any) -> Dict[str, Any]:
         """Проверка безопасности аудио данных"""
         # Здесь может быть проверка длины аудио, формата и т.д.
         # В реальной системе здесь будет анализ аудио файла
@@ -283,7 +364,7 @@ class SecurityGateway:
                     'risk_level': 'medium'
                 }
             
-            return {'allowed': True, 'reason': "Аудио данные безопасны", 'risk_level': 'low'}
+            return _AUDIO_SAFE_RESULT
             
         except Exception as e:
             self.logger.error(f"Ошибка проверки аудио: {e}")
@@ -293,7 +374,7 @@ class SecurityGateway:
                 'risk_level': 'medium'
             }
 
-    async def _check_image_safety(self, image_data: Any) -> Dict[str, Any]:
+    def _check_image_safety(self, image_data: Any) -> Dict[str, Any]:
         """Проверка безопасности изображений"""
         # Здесь может быть проверка размера, формата, содержания
         # В реальной системе здесь будет анализ изображения
@@ -307,7 +388,7 @@ class SecurityGateway:
                     'risk_level': 'medium'
                 }
             
-            return {'allowed': True, 'reason': "Изображение безопасно", 'risk_level': 'low'}
+            return _IMAGE_SAFE_RESULT
             
         except Exception as e:
             self.logger.error(f"Ошибка проверки изображения: {e}")
@@ -317,21 +398,18 @@ class SecurityGateway:
                 'risk_level': 'medium'
             }
 
-    async def _check_request_structure(self, context) -> bool:
+    def _check_request_structure(self, context) -> bool:
         """Проверка структуры запроса"""
         try:
-            # Проверяем обязательные поля
-            if not hasattr(context, 'user_input') or not context.user_input:
-                return False
-            
-            if not hasattr(context, 'input_type') or context.input_type not in ['text', 'audio', 'image']:
-                return False
-            
-            if not hasattr(context, 'request_id') or not context.request_id:
-                return False
-            
-            return True
+            # Проверяем обязательные поля; отсутствующее поле - некорректная структура
+            return (
+                bool(context.user_input)
+                and context.input_type in _VALID_INPUT_TYPES
+                and bool(context.request_id)
+            )
             
+        except AttributeError:
+            return False
         except Exception as e:
             self.logger.error(f"Ошибка проверки структуры запроса: {e}")
             return False
@@ -349,10 +427,12 @@ class SecurityGateway:
     def _extract_client_id(self, request_id: str) -> str:
         """Извлечение идентификатора клиента из request_id"""
         # В реальной системе здесь может быть более сложная логика
-        # Например, извлечение из заголовков или токена
-        return hashlib.md5(request_id.encode()).hexdigest()[:8]
+        # Например, извлечение из заголовков или токена.
+        # Ключ нужен только для счетчиков внутри процесса, поэтому вместо MD5
+        # достаточно встроенного хеша строки (8 шестнадцатеричных символов)
+        return f'{hash(request_id) & 0xFFFFFFFF:08x}'
 
-    async def _log_suspicious_activity(self, activity_type: str, details: Dict[str, Any]):
+    def _log_suspicious_activity(self, activity_type: str, details: Dict[str, Any]):
         """Логирование подозрительной активности"""
         activity = {
             'timestamp': time.time(),
@@ -363,11 +443,35 @@ class SecurityGateway:
         
         self.suspicious_activities.append(activity)
         
-        # Сохраняем только последние 1000 событий
-        if len(self.suspicious_activities) > 1000:
-            self.suspicious_activities = self.suspicious_activities[-1000:]
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Вне цикла событий фоновую задачу не запустить - пишем сразу
+            self._write_activity_log([activity])
+            return
         
-        self.logger.warning(f"Подозрительная активность: {activity_type} - {details}")
+        if self._log_task is None or self._log_task.done():
+            self._log_task = asyncio.create_task(self._log_writer_loop())
+        self._log_queue.put_nowait(activity)
+
+    def _write_activity_log(self, batch: List[Optional[Dict[str, Any]]]):
+        """Запись пачки событий в журнал одной записью"""
+        entries = [f"{activity['type']} - {activity['details']}" for activity in batch if activity is not None]
+        if entries:
+            self.logger.warning("Подозрительная активность: %s", '; '.join(entries))
+
+    async def _log_writer_loop(self):
+        """Фоновая запись подозрительной активности в журнал пачками"""
+        queue = self._log_queue
+        stopping = False
+        while not stopping:
+            batch = [await queue.get()]
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            
+            # None - сигнал остановки после записи уже поставленных событий
+            stopping = None in batch
+            self._write_activity_log(batch)
 
     async def _load_security_patterns(self):
         """Загрузка паттернов безопасности"""
@@ -379,14 +483,103 @@ class SecurityGateway:
             r'(?i)(bash|cmd\.exe|powershell)\s+',
             r'(?i)(phishing|malware|virus|trojan)'
         ]
+        self._malicious_union = self._compile_malicious_union(self.malicious_patterns)
         
         self.suspicious_keywords = [
             'password', 'credit card', 'social security', 'confidential',
             'hack', 'exploit', 'vulnerability', 'backdoor'
         ]
+        self._prepare_keywords()
         
         self.logger.debug("Паттерны безопасности загружены")
 
+    @staticmethod
+    def _compile_malicious_union(patterns: List[str]):
+        """
+        Компиляция всех паттернов в одно выражение-альтернативу при загрузке
+        
+        При наличии google-re2 выражение компилируется в автомат RE2: время поиска
+        линейно от длины текста и не подвержено катастрофическому backtracking.
+        Паттерны, которые RE2 не поддерживает (обратные ссылки, lookaround),
+        компилируются стандартным модулем re. Флаг re.ASCII не используется:
+        классы символов должны совпадать и с пробелами/буквами Unicode.
+        """
+        if not patterns:
+            return None
+        branches = []
+        for index, pattern in enumerate(patterns):
+            if pattern.startswith(_INLINE_IGNORECASE):
+                pattern = pattern[len(_INLINE_IGNORECASE):]
+            branches.append(f'(?P<p{index}>{pattern})')
+        union = '|'.join(branches)
+        
+        re2_union = SecurityGateway._to_re2_syntax(union) if HAS_RE2 else None
+        if re2_union is not None:
+            options = re2.Options()
+            options.case_sensitive = False
+            options.log_errors = False
+            try:
+                return re2.compile(re2_union, options)
+            except re2.error:
+                pass
+        return re.compile(union, re.IGNORECASE)
+
+    @staticmethod
+    def _to_re2_syntax(pattern: str) -> Optional[str]:
+        """
+        Перевод выражения в синтаксис RE2 с сохранением семантики re
+        
+        \\s и \\S заменяются явным набором пробельных символов Unicode, иначе
+        неразрывный пробел и другие пробелы Unicode обходили бы паттерны.
+        Для \\w, \\d, \\b (и \\S внутри класса символов) точной замены нет -
+        возвращается None, и выражение компилируется модулем re.
+        """
+        parts = []
+        in_class = False
+        class_start = -1
+        index = 0
+        length = len(pattern)
+        while index < length:
+            char = pattern[index]
+            if char == '\\' and index + 1 < length:
+                escaped = pattern[index + 1]
+                if escaped in _RE2_ASCII_ONLY_ESCAPES:
+                    return None
+                if escaped == 's':
+                    parts.append(_RE2_UNICODE_SPACE if in_class else f'[{_RE2_UNICODE_SPACE}]')
+                elif escaped == 'S':
+                    if in_class:
+                        return None
+                    parts.append(f'[^{_RE2_UNICODE_SPACE}]')
+                else:
+                    parts.append(pattern[index:index + 2])
+                index += 2
+                continue
+            if in_class:
+                # "]" сразу после "[" или "[^" - обычный символ класса
+                if char == ']' and index > class_start:
+                    in_class = False
+            elif char == '[':
+                in_class = True
+                class_start = index + 1
+                if index + 1 < length and pattern[index + 1] == '^':
+                    class_start += 1
+            parts.append(char)
+            index += 1
+        return ''.join(parts)
+
+    def _prepare_keywords(self):
+        """Приведение ключевых слов к нижнему регистру и построение автомата Ахо-Корасик"""
+        self._keywords_lower = tuple(keyword.lower() for keyword in self.suspicious_keywords)
+        self._keyword_automaton = None
+        if not HAS_AHOCORASICK or not self._keywords_lower:
+            return
+        automaton = ahocorasick.Automaton()
+        for index, keyword in enumerate(self._keywords_lower):
+            automaton.add_word(keyword, index)
+        automaton.make_automaton()
+        self._keyword_automaton = automaton
+
     async def _load_blacklists(self):
         """Загрузка черных списков"""
         # Здесь может быть загрузка из внешних источников или файлов
@@ -399,9 +592,13 @@ class SecurityGateway:
     async def update_security_patterns(self, new_patterns: Dict[str, Any]):
         """Обновление паттернов безопасности"""
         if 'malicious_patterns' in new_patterns:
-            self.malicious_patterns.extend(new_patterns['malicious_patterns'])
+            # Сначала компилируем: некорректный паттерн не должен попасть в список
+            patterns = self.malicious_patterns + list(new_patterns['malicious_patterns'])
+            self._malicious_union = self._compile_malicious_union(patterns)
+            self.malicious_patterns = patterns
         if 'suspicious_keywords' in new_patterns:
             self.suspicious_keywords.extend(new_patterns['suspicious_keywords'])
+            self._prepare_keywords()
         
         self.logger.info("Паттерны безопасности обновлены")
 
@@ -427,12 +624,29 @@ class SecurityGateway:
 
     async def get_recent_suspicious_activities(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Получение последних подозрительных активностей"""
-        return self.suspicious_activities[-limit:]
+        if limit <= 0:
+            return list(self.suspicious_activities)
+        
+        # Обход с конца очереди: копируются только последние limit событий
+        recent = list(islice(reversed(self.suspicious_activities), limit))
+        recent.reverse()
+        return recent
     
     async def shutdown(self):
-        """Корректное завершение работы шлюза безопасности"""
+        """
+        Корректное завершение работы шлюза безопасности
+        
+        Обязателен после использования в цикле событий: останавливает фоновую
+        задачу записи журнала, иначе она остается ждать новых событий.
+        """
         self.logger.info("Завершение работы шлюза безопасности...")
         self.is_initialized = False
+        
+        # Дожидаемся записи уже поставленных в очередь событий
+        if self._log_task is not None and not self._log_task.done():
+            self._log_queue.put_nowait(None)
+            await self._log_task
+        self._log_task = None
         self.logger.info("Шлюз безопасности завершил работу")
 
     async def is_healthy(self) -> bool:
@@ -8,9 +8,16 @@ import asyncio
 import yaml
 import importlib
 import inspect
+import functools
 import psutil
 import time
 import json
+import copy
+import mmap
+import stat
+import pickle
+import re
+from dataclasses import dataclass, asdict, is_dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Any, Union, Callable, Coroutine
@@ -24,7 +31,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Импорты core модулей с улучшенной обработкой ошибок
 try:
-    from core.coordinator import Coordinator
+    from core.coordinator import Coordinator, install_uvloop
     from core.communication_bus import CommunicationBus
     from core.module_manager import ModuleManager
     from core.security_gateway import SecurityGateway
@@ -42,6 +49,51 @@ except ImportError as e:
         print("   - Папка core не существует!")
     sys.exit(1)
 
+# Загрузчик YAML на C (libyaml), если PyYAML собран с ним
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+_NON_WHITESPACE_RE = re.compile(rb'\S')
+
+# Маркер отсутствующего ключа конфигурации
+_MISSING = object()
+
+# Кэш результатов разбора конфигураций в памяти процесса: путь -> (mtime_ns, размер, pickle результата).
+# На диск ничего не пишется - среди конфигураций есть секреты (api_keys.yaml)
+_CONFIG_PARSE_CACHE: Dict[str, Tuple[int, int, bytes]] = {}
+
+def _parse_yaml_file(path: Path) -> Tuple[Any, int, bool]:
+    """
+    Разбор YAML-файла, отображенного в память, с кэшированием результата
+    
+    Файл читается как байты без текстового слоя io; кодировку определяет
+    сам разборщик YAML. Пустой файл не отображается (mmap его не принимает).
+    Результат разбора хранится в памяти в сериализованном виде; пока mtime
+    и размер файла не меняются, повторный разбор заменяется pickle.loads,
+    который отдает каждому вызывающему собственную копию данных.
+    
+    Returns:
+        (данные, размер файла в байтах, есть ли в файле непробельные символы)
+    """
+    stat_result = os.stat(path)
+    size = stat_result.st_size
+    if size == 0:
+        return None, 0, False
+    
+    cache_key = os.path.abspath(path)
+    cached = _CONFIG_PARSE_CACHE.get(cache_key)
+    if cached is not None and cached[0] == stat_result.st_mtime_ns and cached[1] == size:
+        return pickle.loads(cached[2])
+    
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if _NON_WHITESPACE_RE.search(mm) is None:
+                result = (None, size, False)
+            else:
+                result = (yaml.load(mm, Loader=_YAML_LOADER), size, True)
+    
+    _CONFIG_PARSE_CACHE[cache_key] = (stat_result.st_mtime_ns, size, pickle.dumps(result, protocol=5))
+    return result
+
 class SystemConfig:
     """
     Класс для загрузки и управления конфигурацией системы из YAML файлов
@@ -49,6 +101,8 @@ class SystemConfig:
     
     def __init__(self):
         self.config: Dict[str, Any] = {}
+        # Разрешенные значения вложенных ключей для get(); сбрасывается при загрузке
+        self._resolved: Dict[str, Any] = {}
         self.config_path = Path("config")
         self.loaded_files = []
         self.failed_files = []
@@ -56,6 +110,7 @@ class SystemConfig:
         
     async def load(self) -> bool:
         """Загрузка конфигурации из YAML файлов с детальной диагностикой"""
+        self._resolved.clear()
         try:
             # Проверка существования config директории
             if not self.config_path.exists():
@@ -76,39 +131,46 @@ class SystemConfig:
                 ("backup_config.yaml", "Настройки резервного копирования")
             ]
             
-            for filename, description in config_files:
-                config_file = self.config_path / filename
-                if config_file.exists():
+            # Файлы разбираются параллельно в потоках; результаты применяются
+            # в исходном порядке, так как более поздние файлы дополняют конфигурацию
+            config_paths = [self.config_path / filename for filename, _ in config_files]
+            parse_results = await asyncio.gather(
+                *(asyncio.to_thread(_parse_yaml_file, path) for path in config_paths),
+                return_exceptions=True
+            )
+            
+            for (filename, description), config_file, parse_result in zip(config_files, config_paths, parse_results):
+                if not isinstance(parse_result, FileNotFoundError):
                     try:
-                        with open(config_file, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                            if content.strip():
-                                config_data = yaml.safe_load(content)
-                                if config_data:
-                                    self.config.update(config_data)
-                                    self.loaded_files.append({
-                                        'file': filename,
-                                        'description': description,
-                                        'status': 'loaded',
-                                        'size': len(content)
-                                    })
-                                    print(f"✅ Загружен {description}: {config_file}")
-                                else:
-                                    self.failed_files.append({
-                                        'file': filename,
-                                        'description': description,
-                                        'error': 'Файл пуст или содержит только комментарии',
-                                        'status': 'empty'
-                                    })
-                                    print(f"⚠️ Файл {filename} пуст: {config_file}")
+                        if isinstance(parse_result, BaseException):
+                            raise parse_result
+                        config_data, size, has_content = parse_result
+                        if has_content:
+                            if config_data:
+                                self.config.update(config_data)
+                                self.loaded_files.append({
+                                    'file': filename,
+                                    'description': description,
+                                    'status': 'loaded',
+                                    'size': size
+                                })
+                                print(f"✅ Загружен {description}: {config_file}")
                             else:
                                 self.failed_files.append({
                                     'file': filename,
                                     'description': description,
-                                    'error': 'Файл полностью пуст',
+                                    'error': 'Файл пуст или содержит только комментарии',
                                     'status': 'empty'
                                 })
                                 print(f"⚠️ Файл {filename} пуст: {config_file}")
+                        else:
+                            self.failed_files.append({
+                                'file': filename,
+                                'description': description,
+                                'error': 'Файл полностью пуст',
+                                'status': 'empty'
+                            })
+                            print(f"⚠️ Файл {filename} пуст: {config_file}")
                     except yaml.YAMLError as e:
                         error_msg = f"Ошибка YAML в {filename}: {e}"
                         self.failed_files.append({
@@ -140,20 +202,26 @@ class SystemConfig:
             modules_config_dir = self.config_path / "modules"
             if modules_config_dir.exists():
                 loaded_module_configs = 0
-                for config_file in modules_config_dir.glob("*.yaml"):
+                module_configs: Dict[str, Any] = {}
+                module_paths = list(modules_config_dir.glob("*.yaml"))
+                module_results = await asyncio.gather(
+                    *(asyncio.to_thread(_parse_yaml_file, path) for path in module_paths),
+                    return_exceptions=True
+                )
+                
+                for config_file, parse_result in zip(module_paths, module_results):
+                    module_name = config_file.stem
                     try:
-                        module_name = config_file.stem
-                        with open(config_file, 'r', encoding='utf-8') as f:
-                            module_config = yaml.safe_load(f) or {}
-                            if 'modules' not in self.config:
-                                self.config['modules'] = {}
-                            self.config['modules'][module_name] = module_config
+                        if isinstance(parse_result, BaseException):
+                            raise parse_result
+                        module_config, size, _ = parse_result
+                        module_configs[module_name] = module_config or {}
                         loaded_module_configs += 1
                         self.loaded_files.append({
                             'file': f"modules/{config_file.name}",
                             'description': f"Конфигурация модуля {module_name}",
                             'status': 'loaded',
-                            'size': config_file.stat().st_size
+                            'size': size
                         })
                     except Exception as e:
                         self.failed_files.append({
@@ -162,10 +230,15 @@ class SystemConfig:
                             'error': f"Ошибка загрузки: {e}",
                             'status': 'load_error'
                         })
+                # Конфигурации модулей переносятся в общий словарь одним update
+                if module_configs:
+                    self.config.setdefault('modules', {}).update(module_configs)
                 print(f"📊 Загружено конфигураций модулей: {loaded_module_configs}")
             else:
                 print(f"⚠️ Директория конфигураций модулей {modules_config_dir} не найдена")
                     
+            # Значения, запрошенные во время загрузки, могли устареть
+            self._resolved.clear()
             print(f"✅ Загрузка конфигурации завершена: {len(self.loaded_files)} успешно, {len(self.failed_files)} с ошибками")
             
             # Проверка обязательных конфигураций
@@ -183,23 +256,26 @@ class SystemConfig:
         except Exception as e:
             error_msg = f"❌ Критическая ошибка загрузки конфигурации: {e}"
             print(error_msg)
-            print(f"🔍 Детали ошибки: {traceback.format_exc()}")
-            logging.error(error_msg)
-            logging.error(traceback.format_exc())
+            logging.exception(error_msg)
             self.config_errors.append(error_msg)
             return False
     
     def get(self, key: str, default: Optional[Any] = None) -> Any:
         """Получение значения конфигурации по ключу (с поддержкой вложенных ключей через '.')"""
-        keys = key.split('.')
-        value = self.config
-        
+        resolved = self._resolved
         try:
-            for k in keys:
-                value = value[k]
-            return value
-        except (KeyError, TypeError):
-            return default
+            value = resolved[key]
+        except KeyError:
+            value = self.config
+            try:
+                for k in key.split('.'):
+                    value = value[k]
+            except (KeyError, TypeError):
+                # Отсутствие ключа тоже запоминается; default у вызовов может различаться
+                value = _MISSING
+            resolved[key] = value
+        
+        return default if value is _MISSING else value
     
     def get_module_config(self, module_name: str) -> Dict[str, Any]:
         """Получение конфигурации конкретного модуля"""
@@ -423,6 +499,25 @@ class DependencyChecker:
         }
 
 
+# Время жизни результата проверки здоровья (секунды): частые опросы
+# в пределах этого времени получают уже готовый результат
+_HEALTH_CHECK_TTL = 0.5
+
+def _ttl_cached_check(method: Callable[..., Coroutine]) -> Callable[..., Coroutine]:
+    """Кэширование результата проверки SystemHealthMonitor на _HEALTH_CHECK_TTL секунд"""
+    name = method.__name__
+    
+    @functools.wraps(method)
+    async def wrapper(self):
+        cached = self._check_cache.get(name)
+        if cached is not None and time.monotonic() - cached[0] < _HEALTH_CHECK_TTL:
+            return cached[1]
+        result = await method(self)
+        self._check_cache[name] = (time.monotonic(), result)
+        return result
+    
+    return wrapper
+
 class SystemHealthMonitor:
     """
     Комплексный мониторинг здоровья системы
@@ -431,14 +526,20 @@ class SystemHealthMonitor:
     def __init__(self, system_config: SystemConfig):
         self.system_config = system_config
         self.logger = logging.getLogger("SystemHealthMonitor")
-        self.health_metrics: Dict[str, Any] = {}
         self.start_time = datetime.now()
+        # Время загрузки системы не меняется за время работы процесса
+        self._boot_time = datetime.fromtimestamp(psutil.boot_time())
+        # Первый неблокирующий вызов задает точку отсчета для замера загрузки CPU
+        psutil.cpu_percent(interval=None)
+        # Результаты проверок: имя проверки -> (время получения, результат)
+        self._check_cache: Dict[str, Tuple[float, Any]] = {}
         self.performance_data = {
             'startup_time': time.time(),
             'checks_performed': 0,
             'last_check': None
         }
         
+    @_ttl_cached_check
     async def check_system_resources(self) -> Dict[str, Any]:
         """Проверка системных ресурсов с детальной диагностикой"""
         try:
@@ -453,23 +554,31 @@ class SystemHealthMonitor:
                 'python_implementation': platform.python_implementation()
             }
             
+            # Каждый показатель psutil запрашивается один раз; загрузка CPU
+            # берется без блокировки - как среднее с прошлого замера
+            cpu_freq = psutil.cpu_freq()
+            memory = psutil.virtual_memory()
+            disk = psutil.disk_usage('/')
+            net_io = psutil.net_io_counters()
+            now = datetime.now()
+            
             # Детальный мониторинг ресурсов
             resources = {
                 'system_info': system_info,
-                'cpu_percent': psutil.cpu_percent(interval=1),
+                'cpu_percent': psutil.cpu_percent(interval=None),
                 'cpu_count_physical': psutil.cpu_count(logical=False),
                 'cpu_count_logical': psutil.cpu_count(logical=True),
-                'cpu_freq': psutil.cpu_freq()._asdict() if psutil.cpu_freq() else None,
-                'memory_usage': psutil.virtual_memory().percent,
-                'memory_available_gb': round(psutil.virtual_memory().available / (1024**3), 2),
-                'memory_total_gb': round(psutil.virtual_memory().total / (1024**3), 2),
-                'disk_usage': psutil.disk_usage('/').percent,
-                'disk_free_gb': round(psutil.disk_usage('/').free / (1024**3), 2),
-                'disk_total_gb': round(psutil.disk_usage('/').total / (1024**3), 2),
-                'boot_time': datetime.fromtimestamp(psutil.boot_time()),
-                'system_uptime': datetime.now() - datetime.fromtimestamp(psutil.boot_time()),
-                'process_uptime': datetime.now() - self.start_time,
-                'network_io': psutil.net_io_counters()._asdict() if psutil.net_io_counters() else {}
+                'cpu_freq': cpu_freq._asdict() if cpu_freq else None,
+                'memory_usage': memory.percent,
+                'memory_available_gb': round(memory.available / (1024**3), 2),
+                'memory_total_gb': round(memory.total / (1024**3), 2),
+                'disk_usage': disk.percent,
+                'disk_free_gb': round(disk.free / (1024**3), 2),
+                'disk_total_gb': round(disk.total / (1024**3), 2),
+                'boot_time': self._boot_time,
+                'system_uptime': now - self._boot_time,
+                'process_uptime': now - self.start_time,
+                'network_io': net_io._asdict() if net_io else {}
             }
             
             # Проверка критических порогов
@@ -517,6 +626,7 @@ class SystemHealthMonitor:
                 'timestamp': datetime.now().isoformat()
             }
     
+    @_ttl_cached_check
     async def check_database_connections(self) -> Dict[str, Any]:
         """Проверка подключений к базам данных с тестированием соединения"""
         connections = {
@@ -642,6 +752,7 @@ class SystemHealthMonitor:
             
         return connections
     
+    @_ttl_cached_check
     async def check_file_system(self) -> Dict[str, Any]:
         """Проверка файловой системы и критических директорий"""
         critical_paths = [
@@ -662,16 +773,22 @@ class SystemHealthMonitor:
         critical_issues = []
         
         for path, description, critical in critical_paths:
-            path_obj = Path(path)
+            # Один stat на путь вместо отдельных exists/is_dir, один обход дерева
+            # для размера и числа записей
+            try:
+                exists, is_dir = True, stat.S_ISDIR(os.stat(path).st_mode)
+            except OSError:
+                exists = is_dir = False
+            size, file_count = self._scan_directory_tree(path) if exists else (0, 0)
             status_info = {
                 'description': description,
                 'critical': critical,
-                'exists': path_obj.exists(),
-                'is_dir': path_obj.is_dir() if path_obj.exists() else False,
-                'writable': os.access(path_obj, os.W_OK) if path_obj.exists() else False,
-                'readable': os.access(path_obj, os.R_OK) if path_obj.exists() else False,
-                'size': sum(f.stat().st_size for f in path_obj.rglob('*') if f.is_file()) if path_obj.exists() else 0,
-                'file_count': len(list(path_obj.rglob('*'))) if path_obj.exists() else 0,
+                'exists': exists,
+                'is_dir': is_dir,
+                'writable': os.access(path, os.W_OK) if exists else False,
+                'readable': os.access(path, os.R_OK) if exists else False,
+                'size': size,
+                'file_count': file_count,
                 'issues': []
             }
             
@@ -717,6 +834,34 @@ class SystemHealthMonitor:
             'total_size_bytes': sum(status['size'] for status in path_status.values())
         }
     
+    @staticmethod
+    def _scan_directory_tree(path: str) -> Tuple[int, int]:
+        """
+        Размер файлов и число записей в дереве каталога за один обход os.scandir
+        
+        Как и Path.rglob('*'): учитываются файлы и каталоги, символические
+        ссылки на каталоги не обходятся, недоступные каталоги пропускаются.
+        """
+        total_size = 0
+        entry_count = 0
+        pending = [path]
+        while pending:
+            try:
+                with os.scandir(pending.pop()) as entries:
+                    for entry in entries:
+                        entry_count += 1
+                        try:
+                            if entry.is_file():
+                                total_size += entry.stat().st_size
+                            elif entry.is_dir(follow_symlinks=False):
+                                pending.append(entry.path)
+                        except OSError:
+                            continue
+            except (PermissionError, NotADirectoryError):
+                continue
+        return total_size, entry_count
+
+    @_ttl_cached_check
     async def check_external_services(self) -> Dict[str, Any]:
         """Проверка доступности внешних сервисов"""
         services = {}
@@ -867,6 +1012,11 @@ class SystemHealthMonitor:
             return 0, "🔴 ОШИБКА", [f"Ошибка мониторинга здоровья: {e}"], {}
 
 
+def _capture_exception(error: BaseException) -> traceback.TracebackException:
+    """Снимок исключения для отчета без ссылок на кадры стека (строки исходника читаются при форматировании)"""
+    return traceback.TracebackException.from_exception(error, lookup_lines=False)
+
+
 class FunctionalTestEngine:
     """
     Движок функционального тестирования системы
@@ -875,7 +1025,14 @@ class FunctionalTestEngine:
     def __init__(self, system_config: SystemConfig):
         self.system_config = system_config
         self.logger = logging.getLogger("FunctionalTestEngine")
-        self.test_results: Dict[str, Any] = {}
+    
+    # Базовые модули для теста интеграции и пути к ним
+    _MODULE_PATHS: Dict[str, str] = {
+        'text_understander': 'modules/interface/text_understander',
+        'memory_short_term': 'modules/cognitive/memory_short_term',
+        'intent_analyzer': 'core/intent_analyzer.py',
+        'coordinator': 'core/coordinator.py',
+    }
         
     async def test_communication_bus(self) -> Dict[str, Any]:
         """Тестирование шины сообщений"""
@@ -931,11 +1088,11 @@ class FunctionalTestEngine:
             test_result['status'] = 'ERROR'
             test_result['message'] = f'Ошибка тестирования шины: {str(e)}'
             test_result['details'] = {
-                'error': traceback.format_exc(),
+                'error': _capture_exception(e),
                 'error_type': type(e).__name__
             }
             self.logger.error(f"❌ Ошибка тестирования шины сообщений: {e}")
-            self.logger.debug(f"Детали ошибки: {traceback.format_exc()}")
+            self.logger.debug("Детали ошибки", exc_info=True)
             
         return test_result
     
@@ -980,11 +1137,11 @@ class FunctionalTestEngine:
             test_result['status'] = 'ERROR'
             test_result['message'] = f'Ошибка тестирования безопасности: {str(e)}'
             test_result['details'] = {
-                'error': traceback.format_exc(),
+                'error': _capture_exception(e),
                 'error_type': type(e).__name__
             }
             self.logger.error(f"❌ Ошибка тестирования шлюза безопасности: {e}")
-            self.logger.debug(f"Детали ошибки: {traceback.format_exc()}")
+            self.logger.debug("Детали ошибки", exc_info=True)
             
         return test_result
     
@@ -1000,28 +1157,24 @@ class FunctionalTestEngine:
         }
         
         try:
-            # Тестируем базовые модули
-            test_modules = [
-                ('text_understander', 'modules/interface/text_understander'),
-                ('memory_short_term', 'modules/cognitive/memory_short_term'),
-                ('intent_analyzer', 'core/intent_analyzer.py'),
-                ('coordinator', 'core/coordinator.py')
-            ]
-            
             modules_tested = 0
             modules_passed = 0
             details = {}
             
-            self.logger.info(f"Тестирование интеграции модулей: {[m[0] for m in test_modules]}")
+            self.logger.info(f"Тестирование интеграции модулей: {list(self._MODULE_PATHS)}")
             
-            for module_name, module_path in test_modules:
+            for module_name, module_path in self._MODULE_PATHS.items():
                 try:
-                    # Проверяем существование модуля
-                    path_obj = Path(module_path)
+                    # Проверяем существование модуля одним stat
+                    try:
+                        mode = os.stat(module_path).st_mode
+                    except OSError:
+                        mode = None
+                    is_dir = mode is not None and stat.S_ISDIR(mode)
                     
-                    if path_obj.exists() and (path_obj.is_dir() or path_obj.suffix == '.py'):
-                        if path_obj.is_dir():
-                            has_init = (path_obj / "__init__.py").exists()
+                    if mode is not None and (is_dir or module_path.endswith('.py')):
+                        if is_dir:
+                            has_init = os.path.isfile(os.path.join(module_path, "__init__.py"))
                         else:
                             has_init = True
                             
@@ -1031,31 +1184,31 @@ class FunctionalTestEngine:
                             details[module_name] = {
                                 'status': 'PASS',
                                 'message': 'модуль существует и доступен',
-                                'path': str(path_obj)
+                                'path': module_path
                             }
                             self.logger.info(f"✅ Модуль {module_name}: ДОСТУПЕН")
                         else:
                             modules_tested += 1
                             details[module_name] = {
                                 'status': 'FAIL', 
-                                'message': f'отсутствует __init__.py в {path_obj}',
-                                'path': str(path_obj)
+                                'message': f'отсутствует __init__.py в {module_path}',
+                                'path': module_path
                             }
                             self.logger.warning(f"⚠️ Модуль {module_name}: ОТСУТСТВУЕТ __init__.py")
                     else:
                         modules_tested += 1
                         details[module_name] = {
                             'status': 'FAIL',
-                            'message': f'модуль не найден по пути: {path_obj}',
-                            'path': str(path_obj)
+                            'message': f'модуль не найден по пути: {module_path}',
+                            'path': module_path
                         }
-                        self.logger.warning(f"⚠️ Модуль {module_name}: НЕ НАЙДЕН по пути {path_obj}")
+                        self.logger.warning(f"⚠️ Модуль {module_name}: НЕ НАЙДЕН по пути {module_path}")
                 except Exception as e:
                     modules_tested += 1
                     details[module_name] = {
                         'status': 'ERROR',
                         'message': f'ошибка проверки: {str(e)}',
-                        'error': traceback.format_exc()
+                        'error': _capture_exception(e)
                     }
                     self.logger.error(f"❌ Ошибка тестирования модуля {module_name}: {e}")
             
@@ -1075,9 +1228,9 @@ class FunctionalTestEngine:
         except Exception as e:
             test_result['status'] = 'ERROR'
             test_result['message'] = f'Ошибка тестирования интеграции: {str(e)}'
-            test_result['details'] = {'error': traceback.format_exc()}
+            test_result['details'] = {'error': _capture_exception(e)}
             self.logger.error(f"❌ Ошибка тестирования интеграции модулей: {e}")
-            self.logger.debug(f"Детали ошибки: {traceback.format_exc()}")
+            self.logger.debug("Детали ошибки", exc_info=True)
             
         return test_result
     
@@ -1141,7 +1294,7 @@ class FunctionalTestEngine:
         except Exception as e:
             test_result['status'] = 'ERROR'
             test_result['message'] = f'Ошибка тестирования рабочего процесса: {e}'
-            test_result['details'] = {'error': traceback.format_exc()}
+            test_result['details'] = {'error': _capture_exception(e)}
             
         return test_result
     
@@ -1184,15 +1337,27 @@ class FunctionalTestEngine:
         }
 
 
+@dataclass(slots=True)
+class Benchmark:
+    """Замер производительности с целевым значением"""
+    name: str
+    target: float
+    unit: str
+    actual: float = 0
+    status: str = 'PENDING'
+
+
 class PerformanceValidator:
     """
     Валидатор производительности системы
     """
     
-    def __init__(self, system_config: SystemConfig):
+    def __init__(self, system_config: SystemConfig, health_monitor: Optional[SystemHealthMonitor] = None):
         self.system_config = system_config
         self.logger = logging.getLogger("PerformanceValidator")
-        self.benchmarks: Dict[str, Any] = {}
+        # Общий монитор здоровья: повторно используются загрузка CPU и кэш проверок
+        self.health_monitor = health_monitor or SystemHealthMonitor(system_config)
+        self.benchmarks: Optional[Dict[str, Benchmark]] = None  # создается при первой записи
         self.performance_thresholds = {
             'system_startup': 5000,  # 5 секунд
             'module_initialization': 3000,  # 3 секунды
@@ -1201,14 +1366,15 @@ class PerformanceValidator:
             'response_time': 2000  # 2 секунды
         }
         
-    async def validate_response_times(self) -> Dict[str, Any]:
+    async def validate_response_times(self) -> Dict[str, Benchmark]:
         """Валидация времени ответа системы с реальными замерами"""
-        benchmarks = {
-            'system_startup': {'target': self.performance_thresholds['system_startup'], 'actual': 0, 'status': 'PENDING', 'unit': 'ms'},
-            'module_initialization': {'target': self.performance_thresholds['module_initialization'], 'actual': 0, 'status': 'PENDING', 'unit': 'ms'},
-            'message_processing': {'target': self.performance_thresholds['message_processing'], 'actual': 0, 'status': 'PENDING', 'unit': 'ms'},
-            'memory_usage': {'target': self.performance_thresholds['memory_usage'], 'actual': 0, 'status': 'PENDING', 'unit': 'MB'}
-        }
+        thresholds = self.performance_thresholds
+        startup = Benchmark('system_startup', thresholds['system_startup'], 'ms')
+        module_init = Benchmark('module_initialization', thresholds['module_initialization'], 'ms')
+        processing = Benchmark('message_processing', thresholds['message_processing'], 'ms')
+        memory = Benchmark('memory_usage', thresholds['memory_usage'], 'MB')
+        benchmarks = {b.name: b for b in (startup, module_init, processing, memory)}
+        self.benchmarks = benchmarks
         
         try:
             # Реальные замеры производительности
@@ -1217,22 +1383,22 @@ class PerformanceValidator:
             
             # Замер использования памяти
             memory_info = process.memory_info()
-            benchmarks['memory_usage']['actual'] = round(memory_info.rss / (1024 * 1024), 2)
+            memory.actual = round(memory_info.rss / (1024 * 1024), 2)
             
             # Здесь будут реальные замеры времени выполнения
             # Пока используем реалистичные значения на основе текущей системы
-            benchmarks['system_startup']['actual'] = 1200
-            benchmarks['module_initialization']['actual'] = 800
-            benchmarks['message_processing']['actual'] = 150
+            startup.actual = 1200
+            module_init.actual = 800
+            processing.actual = 150
             
             # Проверка соответствия целевым показателям
             for key, benchmark in benchmarks.items():
-                if benchmark['actual'] <= benchmark['target']:
-                    benchmark['status'] = 'PASS'
-                    self.logger.info(f"✅ {key}: {benchmark['actual']}{benchmark['unit']} (цель: {benchmark['target']}{benchmark['unit']}) - ПРОЙДЕН")
+                if benchmark.actual <= benchmark.target:
+                    benchmark.status = 'PASS'
+                    self.logger.info(f"✅ {key}: {benchmark.actual}{benchmark.unit} (цель: {benchmark.target}{benchmark.unit}) - ПРОЙДЕН")
                 else:
-                    benchmark['status'] = 'FAIL'
-                    self.logger.warning(f"⚠️ {key}: {benchmark['actual']}{benchmark['unit']} (цель: {benchmark['target']}{benchmark['unit']}) - ПРОВАЛЕН")
+                    benchmark.status = 'FAIL'
+                    self.logger.warning(f"⚠️ {key}: {benchmark.actual}{benchmark.unit} (цель: {benchmark.target}{benchmark.unit}) - ПРОВАЛЕН")
                     
             return benchmarks
         except Exception as e:
@@ -1242,8 +1408,7 @@ class PerformanceValidator:
     async def validate_resource_usage(self) -> Dict[str, Any]:
         """Валидация использования ресурсов"""
         try:
-            health_monitor = SystemHealthMonitor(self.system_config)
-            resources = await health_monitor.check_system_resources()
+            resources = await self.health_monitor.check_system_resources()
             
             targets = {
                 'cpu_percent': 80,
@@ -1287,7 +1452,7 @@ class PerformanceValidator:
             
             # Расчет общего статуса
             all_pass = all(
-                benchmark['status'] == 'PASS' 
+                benchmark.status == 'PASS'
                 for benchmark in response_times.values()
             ) and all(
                 usage['status'] in ['PASS', 'WARNING'] 
@@ -1321,13 +1486,68 @@ class ModuleDiagnostic:
     Класс для диагностики модулей системы
     """
     
+    # Категории модулей в каталоге modules/
+    _MODULE_CATEGORIES = ('interface', 'cognitive', 'planning', 'skills')
+    
     def __init__(self, system_config: SystemConfig):
         self.system_config = system_config
         self.logger = logging.getLogger("ModuleDiagnostic")
-        self.modules_status: Dict[str, Any] = {}
+        self.modules_status: Optional[Dict[str, Any]] = None  # создается при первой записи
+        # Результат последнего сканирования и отметки mtime каталогов, при которых он получен
+        self._scan_cache: Optional[Dict[str, Dict[str, Any]]] = None
+        self._scan_signature: Optional[Tuple[Tuple[Any, ...], ...]] = None
+        
+    @classmethod
+    def _structure_signature(cls) -> Tuple[Tuple[Any, ...], ...]:
+        """
+        Отметки каталогов и .py файлов структуры проекта
+        
+        Для каталогов (modules/, core/, категорий и всего дерева модулей)
+        учитывается mtime - он меняется при добавлении, удалении или замене
+        файла. Для .py файлов учитываются mtime и размер: правка файла на
+        месте не меняет mtime каталога, но меняет размер модуля в результате.
+        """
+        signature: List[Tuple[Any, ...]] = []
+        
+        def add_stat(path: str):
+            try:
+                signature.append((path, os.stat(path).st_mtime_ns))
+            except OSError:
+                signature.append((path, None))
+        
+        def add_tree(root: str, recursive: bool):
+            stack = [root]
+            while stack:
+                current = stack.pop()
+                try:
+                    with os.scandir(current) as entries:
+                        for entry in entries:
+                            if entry.name.endswith(".py"):
+                                file_stat = entry.stat()
+                                signature.append((entry.path, file_stat.st_mtime_ns, file_stat.st_size))
+                            if recursive and entry.is_dir(follow_symlinks=False):
+                                add_stat(entry.path)
+                                stack.append(entry.path)
+                except OSError:
+                    pass
+        
+        add_stat('modules')
+        for category in cls._MODULE_CATEGORIES:
+            category_path = os.path.join('modules', category)
+            add_stat(category_path)
+            add_tree(category_path, recursive=True)
+        add_stat('core')
+        add_tree('core', recursive=False)
+        return tuple(signature)
         
     async def scan_project_structure(self) -> Dict[str, Dict[str, Any]]:
         """Сканирование структуры проекта и выявление реализованных модулей"""
+        # Структура не менялась с прошлого сканирования - возвращаем сохраненный результат
+        signature = self._structure_signature()
+        if self._scan_cache is not None and signature == self._scan_signature:
+            self.logger.debug("Структура проекта не изменилась, используется результат прошлого сканирования")
+            return copy.deepcopy(self._scan_cache)
+        
         self.logger.info("🔍 Детальное сканирование структуры проекта...")
         
         modules_base = Path("modules")
@@ -1337,23 +1557,26 @@ class ModuleDiagnostic:
         
         try:
             # Сканирование основных категорий модулей
-            categories = ['interface', 'cognitive', 'planning', 'skills']
-            for category in categories:
+            for category in self._MODULE_CATEGORIES:
                 category_path = modules_base / category
                 if category_path.exists():
-                    for module_dir in category_path.iterdir():
-                        if module_dir.is_dir():
-                            module_name = module_dir.name
+                    with os.scandir(category_path) as entries:
+                        for entry in entries:
+                            if not entry.is_dir():
+                                continue
+                            module_name = entry.name
+                            module_dir = Path(entry.path)
+                            py_files, subdirectories, py_size = self._scan_module_dir(entry.path)
                             module_info = {
                                 'path': module_dir,
                                 'category': category,
                                 'type': 'module',
-                                'has_init': (module_dir / "__init__.py").exists(),
-                                'has_main_files': self._check_main_files(module_dir),
-                                'file_count': len(list(module_dir.glob("*.py"))),
-                                'files': [f.name for f in module_dir.glob("*.py")],
-                                'size': sum(f.stat().st_size for f in module_dir.rglob('*.py')),
-                                'subdirectories': [d.name for d in module_dir.iterdir() if d.is_dir()]
+                                'has_init': os.path.isfile(os.path.join(entry.path, "__init__.py")),
+                                'has_main_files': '__init__.py' in py_files and any(name != '__init__.py' for name in py_files),
+                                'file_count': len(py_files),
+                                'files': py_files,
+                                'size': py_size,
+                                'subdirectories': subdirectories
                             }
                             discovered_modules[module_name] = module_info
                             
@@ -1364,18 +1587,20 @@ class ModuleDiagnostic:
             
             # Сканирование core компонентов
             if core_base.exists():
-                for core_file in core_base.glob("*.py"):
-                    if core_file.name != "__init__.py":
-                        module_name = core_file.stem
+                with os.scandir(core_base) as entries:
+                    for entry in entries:
+                        if not entry.name.endswith(".py") or entry.name == "__init__.py":
+                            continue
+                        module_name = entry.name[:-3]
                         discovered_modules[module_name] = {
-                            'path': core_file,
+                            'path': Path(entry.path),
                             'category': 'core',
                             'type': 'core',
                             'has_init': True,
                             'has_main_files': True,
                             'file_count': 1,
-                            'files': [core_file.name],
-                            'size': core_file.stat().st_size,
+                            'files': [entry.name],
+                            'size': entry.stat().st_size,
                             'subdirectories': []
                         }
                         self.logger.debug(f"✅ Core компонент: {module_name}")
@@ -1383,17 +1608,50 @@ class ModuleDiagnostic:
                 self.logger.warning("Директория core не найдена")
             
             self.logger.info(f"📁 Обнаружено {len(discovered_modules)} модулей в структуре проекта")
-            return discovered_modules
+            self._scan_cache = discovered_modules
+            self._scan_signature = signature
+            # Вызывающий получает копию: изменения не затрагивают сохраненный результат
+            return copy.deepcopy(discovered_modules)
         except Exception as e:
             self.logger.error(f"Ошибка сканирования структуры проекта: {e}")
             return {}
     
-    def _check_main_files(self, module_path: Path) -> bool:
-        """Проверка наличия основных файлов модуля"""
-        required_files = ['__init__.py']
-        # Проверяем наличие хотя бы одного основного файла помимо __init__.py
-        other_files = [f for f in module_path.glob("*.py") if f.name != "__init__.py"]
-        return all((module_path / file).exists() for file in required_files) and len(other_files) > 0
+    def _modules_status_dict(self) -> Dict[str, Any]:
+        """Ленивое создание словаря статусов модулей"""
+        if self.modules_status is None:
+            self.modules_status = {}
+        return self.modules_status
+    
+    @staticmethod
+    def _scan_module_dir(path: str) -> Tuple[List[str], List[str], int]:
+        """Один проход по директории модуля через os.scandir.
+        
+        Возвращает имена .py файлов верхнего уровня, имена поддиректорий
+        и суммарный размер всех .py файлов в дереве модуля.
+        """
+        py_files: List[str] = []
+        subdirectories: List[str] = []
+        py_size = 0
+        stack = [path]
+        while stack:
+            current = stack.pop()
+            top_level = current == path
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        is_py = entry.name.endswith(".py")
+                        if is_py:
+                            py_size += entry.stat().st_size
+                        if top_level:
+                            if is_py:
+                                py_files.append(entry.name)
+                            if entry.is_dir():
+                                subdirectories.append(entry.name)
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+            except OSError:
+                continue
+        return py_files, subdirectories, py_size
     
     async def check_module_health(self, module_name: str, module_info: Dict[str, Any]) -> Tuple[bool, str, Dict[str, Any]]:
         """Детальная проверка работоспособности конкретного модуля"""
@@ -1561,7 +1819,7 @@ class ModuleDiagnostic:
                     'diagnostic_details': details
                 }
                 
-                self.modules_status[module_name] = module_status
+                self._modules_status_dict()[module_name] = module_status
                 
                 if is_healthy:
                     if is_enabled:
@@ -1659,6 +1917,21 @@ class ModuleDiagnostic:
         return "\n".join(report)
 
 
+def _report_json_default(obj: Any) -> Any:
+    """Сериализация нестандартных значений JSON отчета.
+    
+    Результаты тестов хранят снимок исключения, а не готовую трассировку:
+    она форматируется только здесь, при записи отчета.
+    """
+    if isinstance(obj, traceback.TracebackException):
+        return ''.join(obj.format())
+    if isinstance(obj, BaseException):
+        return ''.join(traceback.format_exception(type(obj), obj, obj.__traceback__))
+    if is_dataclass(obj):
+        return asdict(obj)
+    return str(obj)
+
+
 class ComprehensiveSystemValidator:
     """
     Комплексный валидатор всей системы с улучшенной диагностикой
@@ -1669,7 +1942,7 @@ class ComprehensiveSystemValidator:
         self.logger = logging.getLogger("ComprehensiveSystemValidator")
         self.health_monitor = SystemHealthMonitor(system_config)
         self.functional_tester = FunctionalTestEngine(system_config)
-        self.performance_validator = PerformanceValidator(system_config)
+        self.performance_validator = PerformanceValidator(system_config, self.health_monitor)
         self.module_diagnostic = ModuleDiagnostic(system_config)
         self.dependency_checker = DependencyChecker()
         
@@ -2040,8 +2313,8 @@ class ComprehensiveSystemValidator:
             performance = validation_results['performance_validation']
             report.append(f"\n⚡ ПРОВЕРКА ПРОИЗВОДИТЕЛЬНОСТИ: {performance['overall_status']}")
             for test_name, result in performance['response_times'].items():
-                status_icon = "✅" if result['status'] == 'PASS' else "❌"
-                report.append(f"   {status_icon} {test_name}: {result['actual']}{result['unit']} (цель: {result['target']}{result['unit']})")
+                status_icon = "✅" if result.status == 'PASS' else "❌"
+                report.append(f"   {status_icon} {test_name}: {result.actual}{result.unit} (цель: {result.target}{result.unit})")
             
             # Диагностика модулей
             modules = validation_results['module_diagnostics']
@@ -2229,7 +2502,7 @@ class SyntheticMind:
         # Сохранение JSON отчета
         json_file = Path("logs/system/diagnostic_results.json")
         with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(validation_results, f, indent=2, ensure_ascii=False, default=str)
+            json.dump(validation_results, f, indent=2, ensure_ascii=False, default=_report_json_default)
         
         self.logger.info(f"📊 JSON отчет сохранен в: {json_file}")
 
@@ -2254,7 +2527,7 @@ class SyntheticMind:
         validation_file.parent.mkdir(parents=True, exist_ok=True)
         
         with open(validation_file, 'w', encoding='utf-8') as f:
-            json.dump(validation_results, f, indent=2, ensure_ascii=False, default=str)
+            json.dump(validation_results, f, indent=2, ensure_ascii=False, default=_report_json_default)
         
         self.logger.info(f"📄 Полный отчет в JSON сохранен в: {validation_file}")
         
@@ -2296,7 +2569,7 @@ class SyntheticMind:
         validation_file.parent.mkdir(parents=True, exist_ok=True)
         
         with open(validation_file, 'w', encoding='utf-8') as f:
-            json.dump(validation_results, f, indent=2, ensure_ascii=False, default=str)
+            json.dump(validation_results, f, indent=2, ensure_ascii=False, default=_report_json_default)
         
         self.logger.info(f"📄 Полный отчет в JSON сохранен в: {validation_file}")
         
@@ -2619,8 +2892,8 @@ def create_config_files():
 
 if __name__ == "__main__":
     # Проверка версии Python
-    if sys.version_info < (3, 8):
-        print("❌ Требуется Python 3.8 или выше")
+    if sys.version_info < (3, 11):
+        print("❌ Требуется Python 3.11 или выше")
         sys.exit(1)
     
     # Создание необходимых директорий
@@ -2647,6 +2920,10 @@ if __name__ == "__main__":
     # Создание конфигурационных файлов
     create_config_files()
     
+    # Цикл событий uvloop, если установлен
+    if install_uvloop():
+        print("⚡ Используется цикл событий uvloop")
+    
     # Запуск основного цикла
     try:
         asyncio.run(main())
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Тестирование определения намерений в IntentAnalyzer
+"""
+
+import asyncio
+import os
+import sys
+
+# Добавляем корневую директорию в путь для импортов
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from core.intent_analyzer import IntentAnalyzer
+
+
+def create_analyzer() -> IntentAnalyzer:
+    """Создание инициализированного анализатора со стандартными паттернами"""
+    analyzer = IntentAnalyzer({})
+    asyncio.run(analyzer.initialize())
+    return analyzer
+
+
+def detect(analyzer: IntentAnalyzer, text: str):
+    return analyzer._detect_intent(analyzer._preprocess_text(text))
+
+
+def test_known_phrases():
+    """Намерения и уверенность для известных фраз"""
+    analyzer = create_analyzer()
+    expected = {
+        "привет как дела": ('greeting', 0.4),
+        "сколько времени": ('time', 0.4),
+        "который час": ('time', 0.2),
+        "посчитай 2+2": ('calculation', 0.4),
+        "какая погода завтра": ('weather', 0.2),
+        "расскажи анекдот": ('unknown', 0.1),
+    }
+    for text, result in expected.items():
+        assert detect(analyzer, text) == result, text
+
+
+def test_overlapping_patterns_are_counted():
+    """Пересекающиеся совпадения разных паттернов учитываются по отдельности"""
+    analyzer = create_analyzer()
+    analyzer.intent_patterns = {'time': [r'сколько\s+времени', r'времени']}
+    analyzer._compile_patterns()
+    assert detect(analyzer, "сколько времени") == ('time', 0.4)
+
+
+def test_tie_is_broken_by_declaration_order():
+    """При равном счете выбирается намерение, объявленное раньше"""
+    analyzer = create_analyzer()
+    analyzer.intent_patterns = {'first': [r'поиск'], 'second': [r'поиск']}
+    analyzer._compile_patterns()
+    assert detect(analyzer, "поиск") == ('first', 0.2)
+
+    analyzer.intent_patterns = {'second': [r'поиск'], 'first': [r'поиск']}
+    analyzer._compile_patterns()
+    assert detect(analyzer, "поиск") == ('second', 0.2)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Тестирование проверки циклических зависимостей в ModuleManager
+"""
+
+import asyncio
+import os
+import sys
+import types
+
+# Добавляем корневую директорию в путь для импортов
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from core.module_manager import ModuleManager
+
+
+def create_manager(dependencies):
+    """Менеджер с заданным графом зависимостей (без чтения config/modules)"""
+    manager = ModuleManager({'modules': {}})
+
+    async def register():
+        for module_name, deps in dependencies.items():
+            await manager.update_module_config(module_name, {'dependencies': deps})
+
+    asyncio.run(register())
+    return manager
+
+
+def test_cycle_members_are_detected():
+    """На цикле лежат только модули, достижимые из самих себя"""
+    manager = create_manager({
+        'a': ['b'],
+        'b': ['c'],
+        'c': ['a'],
+        'd': ['a'],
+        'self_ref': ['self_ref'],
+        'e': ['f'],
+    })
+    assert manager._cyclic_modules == {'a', 'b', 'c', 'self_ref'}
+
+
+def test_cyclic_module_is_rejected():
+    """Модуль на цикле не загружается и помечается ошибкой"""
+    manager = create_manager({'a': ['b'], 'b': ['a']})
+    assert asyncio.run(manager.load_module('a')) is False
+    assert manager.module_states['a'] == 'error'
+    assert 'a' not in manager.loaded_modules
+
+
+def test_cycle_is_cleared_after_config_update():
+    """Разрыв цикла обновлением конфигурации снимает запрет на загрузку"""
+    manager = create_manager({'a': ['b'], 'b': ['a']})
+    asyncio.run(manager.update_module_config('b', {'dependencies': []}))
+    assert manager._cyclic_modules == set()
+
+
+def test_dependency_layers_report_cycles():
+    """Слои загрузки идут от зависимостей к зависимым, циклы возвращаются отдельно"""
+    manager = ModuleManager({'modules': {
+        'app': {'dependencies': ['db', 'cache']},
+        'cache': {'dependencies': ['db']},
+        'db': {},
+        'x': {'dependencies': ['y']},
+        'y': {'dependencies': ['x']},
+    }})
+    layers, cyclic = manager._dependency_layers(['app', 'x'])
+    assert layers == [['db'], ['cache'], ['app']]
+    assert sorted(cyclic) == ['x', 'y']
+
+
+def test_module_names_are_canonical():
+    """Имена модулей и зависимостей не зависят от регистра написания"""
+    manager = ModuleManager({'modules': {'Visual_Processor': {'dependencies': ['Memory_Short_Term']}}})
+    assert 'visual_processor' in manager.config['modules']
+    assert manager.config['modules']['visual_processor']['dependencies'] == ['memory_short_term']
+
+    asyncio.run(manager.update_module_config('Task_Planner', {'dependencies': ['GOALS']}))
+    assert manager.module_dependencies['task_planner'] == ['goals']
+    assert manager._dependents['goals'] == {'task_planner'}
+    assert asyncio.run(manager.get_module('MODULE_MANAGER')) is manager
+
+
+class SlowModule:
+    """Тестовый модуль с долгой инициализацией; считает созданные экземпляры"""
+    instances = 0
+
+    def __init__(self, config):
+        SlowModule.instances += 1
+
+    async def initialize(self):
+        await asyncio.sleep(0.01)
+
+
+def test_shared_dependency_is_loaded_once():
+    """Одновременные загрузки общей зависимости ждут одну и ту же загрузку"""
+    fake_package = types.ModuleType('fake_slow_modules')
+    fake_package.SlowModule = SlowModule
+    sys.modules['fake_slow_modules'] = fake_package
+    spec = {'path': 'fake_slow_modules', 'class_name': 'SlowModule'}
+    manager = ModuleManager({'modules': {
+        'shared': dict(spec),
+        'left': dict(spec, dependencies=['shared']),
+        'right': dict(spec, dependencies=['shared']),
+    }})
+    SlowModule.instances = 0
+
+    async def load_both():
+        return await asyncio.gather(manager.load_module('left'), manager.load_module('right'))
+
+    try:
+        assert asyncio.run(load_both()) == [True, True]
+    finally:
+        del sys.modules['fake_slow_modules']
+    assert SlowModule.instances == 3
+    assert set(manager.loaded_modules) == {'module_manager', 'shared', 'left', 'right'}
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Тестирование агрегатов скользящего окна PerformanceMonitor
+"""
+
+import math
+import os
+import random
+import sys
+
+# Добавляем корневую директорию в путь для импортов
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from core.performance_monitor import PerformanceMetrics, _SlidingWindow
+
+
+def make_metrics(timestamp: float, processing_time: float, error_count: int = 0) -> PerformanceMetrics:
+    return PerformanceMetrics(
+        timestamp=timestamp,
+        request_id=f"req_{timestamp}",
+        processing_time=processing_time,
+        module_times={},
+        memory_usage=processing_time * 2,
+        cpu_usage=processing_time / 2,
+        error_count=error_count
+    )
+
+
+def assert_matches_brute_force(window: _SlidingWindow, expected):
+    """Сравнение агрегатов окна с прямым расчетом по его записям"""
+    assert list(window.entries) == expected
+    assert window.count == len(expected)
+    if not expected:
+        assert not window.max_times and not window.min_times
+        return
+    times = [m.processing_time for m in expected]
+    assert window.max_times[0][1] == max(times)
+    assert window.min_times[0][1] == min(times)
+    assert math.isclose(window.sum_time / window.count, sum(times) / len(times), abs_tol=1e-9)
+    assert math.isclose(window.sum_cpu, sum(m.cpu_usage for m in expected), abs_tol=1e-9)
+    assert math.isclose(window.sum_memory, sum(m.memory_usage for m in expected), abs_tol=1e-9)
+    assert window.errors == sum(1 for m in expected if m.error_count > 0)
+
+
+def test_window_matches_brute_force():
+    """min/max/mean окна совпадают с перебором при вытеснении по времени и емкости"""
+    rng = random.Random(42)
+    span, capacity = 10.0, 25
+    window = _SlidingWindow(span, capacity)
+    expected = []
+    now = 0.0
+    for _ in range(2000):
+        now += rng.uniform(0.0, 1.0)
+        metrics = make_metrics(now, rng.choice([rng.uniform(0.0, 5.0), 1.0]), rng.randint(0, 1))
+        window.add(metrics)
+        expected.append(metrics)
+        expected = expected[-capacity:]
+
+        if rng.random() < 0.3:
+            cutoff = now - span
+            window.expire(cutoff)
+            expected = [m for m in expected if m.timestamp > cutoff]
+
+        assert_matches_brute_force(window, expected)
+
+
+def test_window_expires_completely():
+    """Полностью вытесненное окно обнуляет агрегаты"""
+    window = _SlidingWindow(5.0, 10)
+    for i in range(5):
+        window.add(make_metrics(float(i), float(i), error_count=1))
+    window.expire(10.0)
+    assert_matches_brute_force(window, [])
+    assert window.errors == 0 and window.sum_time == 0.0
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Тестирование ограничения частоты запросов в SecurityGateway
+"""
+
+import os
+import sys
+
+# Добавляем корневую директорию в путь для импортов
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from core import security_gateway
+from core.security_gateway import SecurityGateway
+
+
+class FakeClock:
+    """Управляемые часы вместо time.monotonic"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def create_gateway(monkeypatch, **config):
+    clock = FakeClock()
+    monkeypatch.setattr(security_gateway.time, 'monotonic', clock)
+    return SecurityGateway(config), clock
+
+
+def test_burst_is_limited(monkeypatch):
+    """Новый клиент проходит max_requests запросов подряд, следующий отклоняется"""
+    gateway, _ = create_gateway(monkeypatch)
+    results = [gateway._check_rate_limit('client', window_seconds=60, max_requests=5) for _ in range(6)]
+    assert results == [True] * 5 + [False]
+
+
+def test_tokens_refill_over_time(monkeypatch):
+    """Токены пополняются равномерно: max_requests за window_seconds"""
+    gateway, clock = create_gateway(monkeypatch)
+    for _ in range(5):
+        assert gateway._check_rate_limit('client', window_seconds=60, max_requests=5)
+    assert not gateway._check_rate_limit('client', window_seconds=60, max_requests=5)
+
+    # Через 12 секунд пополняется ровно один токен
+    clock.now += 12
+    assert gateway._check_rate_limit('client', window_seconds=60, max_requests=5)
+    assert not gateway._check_rate_limit('client', window_seconds=60, max_requests=5)
+
+    # Через полное окно корзина снова заполнена, но не сверх max_requests
+    clock.now += 600
+    results = [gateway._check_rate_limit('client', window_seconds=60, max_requests=5) for _ in range(6)]
+    assert results == [True] * 5 + [False]
+
+
+def test_clients_are_limited_independently(monkeypatch):
+    """Исчерпанный лимит одного клиента не влияет на другого"""
+    gateway, _ = create_gateway(monkeypatch)
+    for _ in range(3):
+        gateway._check_rate_limit('first', window_seconds=60, max_requests=3)
+    assert not gateway._check_rate_limit('first', window_seconds=60, max_requests=3)
+    assert gateway._check_rate_limit('second', window_seconds=60, max_requests=3)
+
+
+def test_idle_and_excess_clients_are_evicted(monkeypatch):
+    """Неактивные дольше окна и сверх max_tracked_clients записи удаляются"""
+    gateway, clock = create_gateway(monkeypatch, rate_limit_max_clients=3)
+    for index in range(5):
+        assert gateway._check_rate_limit(f'client_{index}', window_seconds=60, max_requests=5)
+    assert len(gateway.rate_limits) == 3
+
+    clock.now += 61
+    assert gateway._check_rate_limit('late', window_seconds=60, max_requests=5)
+    assert len(gateway.rate_limits) == 1